@@ -9,7 +9,7 @@ import os
 import re
 import time
 import requests
-from typing import Optional
+from typing import Optional, Sequence
 
 from dotenv import load_dotenv
 from rich.markdown import Markdown
@@ -29,6 +29,17 @@ else:
 LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-oss-120b")
 LLM_API_KEY = os.getenv("LLM_API_KEY") or os.getenv("LMSTUDIO_API_KEY")
 
+# Anthropic models only cache prompt prefixes marked with cache_control breakpoints
+# (OpenAI-style endpoints cache the leading prefix implicitly). On by default for
+# Claude models; LLM_PROMPT_CACHE=1/0 forces it either way.
+_prompt_cache_env = os.getenv("LLM_PROMPT_CACHE", "").strip().lower()
+if _prompt_cache_env:
+    PROMPT_CACHE_BREAKPOINTS = _prompt_cache_env in ("1", "true", "yes", "on")
+else:
+    PROMPT_CACHE_BREAKPOINTS = LLM_MODEL.startswith("anthropic/") or "claude" in LLM_MODEL.lower()
+# Shorter prefixes are not cached by the provider, so a breakpoint would only add overhead
+PROMPT_CACHE_MIN_TOKENS = 1024
+
 MAX_MESSAGES_IN_CONTEXT = 50
 CONSOLIDATION_MAX_MESSAGES = 60
 SYSTEM_MESSAGE_ROLES = {"system"}
@@ -40,6 +51,10 @@ REQUEST_TIMEOUT = (5, 120)
 MAX_RETRIES = 2
 RETRY_BASE_DELAY = 2  # seconds, doubles each retry
 
+# Streaming re-parses the whole reply as Markdown on each display update; cap
+# updates at the Live refresh rate so long replies don't go quadratic.
+STREAM_RENDER_INTERVAL = 1 / 15  # seconds
+
 # Tool result truncation (prevents a single large result from bloating context)
 MAX_TOOL_RESULT_CHARS = 6000  # ~1500 tokens
 
@@ -85,6 +100,70 @@ def truncate_messages(messages: list, max_messages: int = MAX_MESSAGES_IN_CONTEX
     return system_msgs + kept_conversation
 
 
+def with_cache_breakpoints(messages: list) -> list:
+    """Return messages with cache_control breakpoints on the stable system prefix.
+
+    Breakpoints come from build_system_prompt_segments(): the system message
+    built from it starts with the "instructions" segment (never changes),
+    followed by the other reusable segments (soul and memory map, which change
+    only with memory), then the date and core memory. The instructions and the
+    rest of the reusable prefix each get their own cacheable content part; the
+    volatile tail is sent uncached. A system message built before the latest
+    memory write only matches the segments up to the first one that changed.
+    Messages are returned unchanged when the first one is not a chat system
+    prompt (e.g. consolidation calls) or SYSTEM_PROMPT is too short to be cached.
+    """
+    from prompts import SYSTEM_PROMPT, SYSTEM_PROMPT_TOKENS, build_system_prompt_segments
+
+    if SYSTEM_PROMPT_TOKENS < PROMPT_CACHE_MIN_TOKENS or not messages:
+        return messages
+    first = messages[0]
+    content = first.get("content")
+    if (first.get("role") not in SYSTEM_MESSAGE_ROLES or not isinstance(content, str)
+            or not content.startswith(SYSTEM_PROMPT)):
+        return messages
+    # End offsets of the leading reusable segments the system message contains
+    cuts = []
+    pos = 0
+    for _, text, reusable in build_system_prompt_segments():
+        if not reusable or not content.startswith(text, pos):
+            break
+        pos += len(text)
+        cuts.append(pos)
+    parts = [{"type": "text", "text": content[:cuts[0]], "cache_control": {"type": "ephemeral"}}]
+    if cuts[-1] > cuts[0]:
+        parts.append({
+            "type": "text",
+            "text": content[cuts[0]:cuts[-1]],
+            "cache_control": {"type": "ephemeral"},
+        })
+    if cuts[-1] < len(content):
+        parts.append({"type": "text", "text": content[cuts[-1]:]})
+    return [{**first, "content": parts}, *messages[1:]]
+
+
+# UTF-8 JSON of each tool list keyed by id(); the list itself is kept in the
+# value so the id can't be reused by another object while the entry exists.
+_tools_json_cache: dict = {}
+
+
+def _tools_json(tools: Sequence[dict]) -> bytes:
+    """Encoded JSON for a tool list, built once per list object (tool lists are module constants)."""
+    cached = _tools_json_cache.get(id(tools))
+    if cached is None or cached[0] is not tools:
+        cached = (tools, json.dumps(tools).encode("utf-8"))
+        _tools_json_cache[id(tools)] = cached
+    return cached[1]
+
+
+def _encode_request_body(payload: dict, tools: Optional[Sequence[dict]]) -> bytes:
+    """Encode the request payload, splicing in the pre-encoded tools JSON."""
+    body = json.dumps(payload, allow_nan=False).encode("utf-8")
+    if tools:
+        body = b"".join((body[:-1], b', "tools": ', _tools_json(tools), b"}"))
+    return body
+
+
 def call_llm(messages, tools=None, stream=False, live_display=None, max_tokens=None):
     """Call OpenAI-compatible chat completions API, optionally with streaming."""
     if tools and max_tokens is None:
@@ -96,34 +175,36 @@ def call_llm(messages, tools=None, stream=False, live_display=None, max_tokens=N
 
     payload = {
         "model": LLM_MODEL,
-        "messages": messages,
+        "messages": with_cache_breakpoints(messages) if PROMPT_CACHE_BREAKPOINTS else messages,
         "temperature": 0.7,
         "max_tokens": effective_max_tokens,
         "stream": stream
     }
 
-    if tools:
-        payload["tools"] = tools
-        # Do not set tool_choice: "auto" — some backends then omit or alter the system
-        # message (e.g. replace with tool-only prompt), which drops core memory from context.
+    # Tools are spliced into the body by _encode_request_body. Do not set
+    # tool_choice: "auto" — some backends then omit or alter the system message
+    # (e.g. replace with tool-only prompt), which drops core memory from context.
+    body = _encode_request_body(payload, tools)
 
-    headers = {}
+    headers = {"Content-Type": "application/json"}
     if LLM_API_KEY:
         headers["Authorization"] = f"Bearer {LLM_API_KEY}"
 
     for attempt in range(MAX_RETRIES + 1):
         try:
             if not stream:
-                response = requests.post(CHAT_COMPLETIONS_URL, json=payload, headers=headers, timeout=REQUEST_TIMEOUT)
+                response = requests.post(CHAT_COMPLETIONS_URL, data=body, headers=headers, timeout=REQUEST_TIMEOUT)
                 response.raise_for_status()
                 return response.json()
 
             # Streaming mode
-            response = requests.post(CHAT_COMPLETIONS_URL, json=payload, headers=headers, stream=True, timeout=REQUEST_TIMEOUT)
+            response = requests.post(CHAT_COMPLETIONS_URL, data=body, headers=headers, stream=True, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
 
             full_content = ""
             tool_calls_accumulated = []
+            next_render = 0.0  # first token always renders immediately
+            rendered_len = 0
 
             for line in response.iter_lines():
                 if not line:
@@ -150,7 +231,11 @@ def call_llm(messages, tools=None, stream=False, live_display=None, max_tokens=N
                 if content:
                     full_content += content
                     if live_display:
-                        live_display.update(Markdown(full_content))
+                        now = time.monotonic()
+                        if now >= next_render:
+                            live_display.update(Markdown(full_content))
+                            next_render = now + STREAM_RENDER_INTERVAL
+                            rendered_len = len(full_content)
 
                 # Accumulate tool calls (they come in pieces)
                 if "tool_calls" in delta:
@@ -171,6 +256,10 @@ def call_llm(messages, tools=None, stream=False, live_display=None, max_tokens=N
                             if "arguments" in func and func["arguments"] is not None:
                                 tool_calls_accumulated[idx]["function"]["arguments"] += func["arguments"]
 
+            # Flush tokens that arrived after the last throttled render
+            if live_display and len(full_content) != rendered_len:
+                live_display.update(Markdown(full_content))
+
             # Return in format compatible with existing code
             message = {"content": full_content if full_content else None}
             if tool_calls_accumulated:
@@ -283,7 +372,7 @@ def _repair_truncated_json(s: str) -> Optional[str]:
 
 def run_agent_loop(
     initial_messages: list,
-    tools: list,
+    tools: Sequence[dict],
     max_iterations: int = 10,
     stream_first_response: bool = True,
     show_tool_calls: bool = True,
@@ -298,7 +387,7 @@ def run_agent_loop(
         console, StreamingDisplay, start_spinner,
         TOOL_SPINNER_TEXT, display_tool_done, display_error, display_response,
     )
-    from tools import parse_tool_arguments, execute_tool
+    from tools import parse_tool_arguments, execute_tool, execute_tools_concurrently, READ_ONLY_TOOLS
 
     messages = list(initial_messages)
     iteration = 0
@@ -342,17 +431,36 @@ def run_agent_loop(
         messages.append(assistant_msg)
 
         if tool_calls_raw:
-            for i, tool_call in enumerate(tool_calls_raw):
-                func_name = tool_call["function"]["name"]
-                args = parse_tool_arguments(tool_call)
-                tool_call_id = tool_call.get("id", f"call_{i}")
+            calls = [(tc["function"]["name"], parse_tool_arguments(tc)) for tc in tool_calls_raw]
 
+            if len(calls) > 1 and all(func_name in READ_ONLY_TOOLS for func_name, _ in calls):
+                # Independent reads: run them concurrently under one spinner
                 tool_spinner = None
                 if show_tool_calls:
-                    desc = TOOL_SPINNER_TEXT.get(func_name, "thinking...")
-                    tool_spinner = start_spinner(desc)
-
-                result = execute_tool(func_name, args)
+                    tool_spinner = start_spinner(TOOL_SPINNER_TEXT.get(calls[0][0], "thinking..."))
+                try:
+                    results = execute_tools_concurrently(calls)
+                finally:
+                    if tool_spinner:
+                        tool_spinner.stop()
+                if show_tool_calls:
+                    for func_name, args in calls:
+                        display_tool_done(func_name, args)
+            else:
+                results = []
+                for func_name, args in calls:
+                    tool_spinner = None
+                    if show_tool_calls:
+                        desc = TOOL_SPINNER_TEXT.get(func_name, "thinking...")
+                        tool_spinner = start_spinner(desc)
+
+                    results.append(execute_tool(func_name, args))
+
+                    if show_tool_calls and tool_spinner:
+                        tool_spinner.stop()
+                        display_tool_done(func_name, args)
+
+            for i, (tool_call, (func_name, _), result) in enumerate(zip(tool_calls_raw, calls, results)):
                 result_str = result if isinstance(result, str) else str(result)
 
                 # Truncate oversized tool results to limit context growth
@@ -362,13 +470,9 @@ def run_agent_loop(
                         + f"\n\n[truncated — {len(result_str)} chars total, showing first {MAX_TOOL_RESULT_CHARS}]"
                     )
 
-                if show_tool_calls and tool_spinner:
-                    tool_spinner.stop()
-                    display_tool_done(func_name, args)
-
                 messages.append({
                     "role": "tool",
-                    "tool_call_id": tool_call_id,
+                    "tool_call_id": tool_call.get("id", f"call_{i}"),
                     "name": func_name,
                     "content": result_str,
                 })
@@ -92,6 +92,20 @@ def estimate_tokens(text: str) -> int:
     return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
 
 
+# Bumped by every write path below that can change the soul files or the
+# memory map, so derived text (e.g. the system prompt) knows when to rebuild.
+_memory_generation = 0
+
+# Last read_soul() result as (memory_signature(), content)
+_soul_cache: Optional[tuple] = None
+
+
+def _mark_memory_changed() -> None:
+    """Record that soul or memory-map content may have changed."""
+    global _memory_generation
+    _memory_generation += 1
+
+
 def _get_vault_path() -> Optional[Path]:
     """Get vault path from environment. Returns None if missing or invalid."""
     vault_path = os.getenv("OBSIDIAN_PATH")
@@ -139,6 +153,7 @@ def delete_ai_memory_folder() -> Dict:
                 shutil.rmtree(item)
             else:
                 item.unlink()
+        _mark_memory_changed()
         return {"success": True}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -160,6 +175,7 @@ def reset_soul_folder() -> Dict:
         soul_dir.mkdir(parents=True, exist_ok=True)
         for file_key, filename in SOUL_FILES.items():
             (soul_dir / filename).write_text(DEFAULT_SOUL_SEEDS[file_key], encoding="utf-8")
+        _mark_memory_changed()
         return {"success": True}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -219,6 +235,30 @@ def ensure_memory_structure() -> Dict:
         return {"success": False, "error": str(e)}
 
 
+def memory_signature() -> tuple:
+    """
+    Cheap signature of the vault state the system prompt is built from.
+
+    Combines the vault path, the write counter bumped by this module, and the
+    stat of each soul file so soul edits made outside the app (e.g. in
+    Obsidian) are noticed too. Equal signatures mean read_soul() and
+    build_memory_map() can be assumed unchanged.
+    """
+    root = _memory_root()
+    if not root:
+        return (None, _memory_generation)
+    soul_paths = [root / SOUL_FOLDER / filename for filename in SOUL_FILES.values()]
+    soul_paths.append(root / "soul.md")  # legacy location, still read by read_soul
+    stamps = []
+    for path in soul_paths:
+        try:
+            stat = path.stat()
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            stamps.append(None)
+    return (str(root), _memory_generation, tuple(stamps))
+
+
 def read_core_memory() -> str:
     """Load core-memory.md content. Returns empty string if missing or on error."""
     root = _memory_root()
@@ -234,7 +274,22 @@ def read_core_memory() -> str:
 
 
 def read_soul() -> str:
-    """Load all soul files and concatenate. Returns fallback string if empty."""
+    """Load all soul files and concatenate. Returns fallback string if empty.
+
+    Reuses the previous result while memory_signature() is unchanged, so the
+    system prompt and consolidation don't re-read the soul on every call.
+    """
+    global _soul_cache
+    signature = memory_signature()
+    if _soul_cache and _soul_cache[0] == signature:
+        return _soul_cache[1]
+    content = _read_soul_files()
+    _soul_cache = (signature, content)
+    return content
+
+
+def _read_soul_files() -> str:
+    """Read and concatenate the soul files from disk (see read_soul)."""
     root = _memory_root()
     if not root:
         return SOUL_FALLBACK
@@ -280,6 +335,15 @@ def read_soul() -> str:
 # Observations: append-only log with summarization
 # ---------------------------------------------------------------------------
 
+# A line that is exactly "---": separates the header and each entry
+_OBS_SEPARATOR_RE = re.compile(r'^---\s*$', re.MULTILINE)
+_OBS_SUMMARY_RE = re.compile(r'## Summarized observations \(through \d{4}-\d{2}-\d{2}\).*', re.DOTALL)
+# "[YYYY-MM-DD HH:MM]" opening an entry (group 1 is the timestamp)
+_OBS_TIMESTAMP_RE = re.compile(r'^\[(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2})\]')
+_OBS_RESOLVED_RE = re.compile(r'^\[resolved:\s*(.+?)\]', re.MULTILINE)
+# A separator followed by a timestamp inside text meant to be one entry
+_OBS_MULTI_ENTRY_RE = re.compile(r'---\s*\n\s*\[?\d{4}-')
+
 def _is_default_observations(content: str) -> bool:
     """Check if content is the default observations seed or empty."""
     stripped = (content or "").strip()
@@ -288,7 +352,7 @@ def _is_default_observations(content: str) -> bool:
 
 def _has_structured_entries(content: str) -> bool:
     """Check if observations content has structured timestamped entries."""
-    return bool(re.search(r'^---\s*$', content, re.MULTILINE))
+    return bool(_OBS_SEPARATOR_RE.search(content))
 
 
 def _extract_legacy_content(content: str) -> str:
@@ -326,7 +390,7 @@ def _parse_observation_entries(content: str) -> dict:
         return result
 
     # Split on lines that are exactly '---' (with optional whitespace)
-    chunks = re.split(r'^---\s*$', content, flags=re.MULTILINE)
+    chunks = _OBS_SEPARATOR_RE.split(content)
 
     if not chunks:
         return result
@@ -336,36 +400,29 @@ def _parse_observation_entries(content: str) -> dict:
     result['header'] = header
 
     # Check for summary block in header
-    summary_match = re.search(
-        r'## Summarized observations \(through \d{4}-\d{2}-\d{2}\).*',
-        header,
-        re.DOTALL,
-    )
+    summary_match = _OBS_SUMMARY_RE.search(header)
     if summary_match:
         result['summary_block'] = summary_match.group(0).strip()
 
     # Parse entries from subsequent chunks
-    timestamp_re = re.compile(r'^\[(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2})\]')
-    resolved_re = re.compile(r'^\[resolved:\s*(.+?)\]', re.MULTILINE)
-
     for chunk in chunks[1:]:
         chunk = chunk.strip()
         if not chunk:
             continue
 
-        ts_match = timestamp_re.match(chunk)
+        ts_match = _OBS_TIMESTAMP_RE.match(chunk)
         timestamp = ts_match.group(1) if ts_match else None
 
-        res_match = resolved_re.search(chunk)
+        res_match = _OBS_RESOLVED_RE.search(chunk)
         resolved = res_match.group(1) if res_match else None
 
         # Extract clean observation text (skip timestamp and resolved lines)
         lines = chunk.split('\n')
         text_lines = []
         for line in lines:
-            if timestamp_re.match(line):
+            if _OBS_TIMESTAMP_RE.match(line):
                 continue
-            if resolved_re.match(line):
+            if _OBS_RESOLVED_RE.match(line):
                 continue
             text_lines.append(line)
         text = '\n'.join(text_lines).strip()
@@ -398,7 +455,7 @@ def update_observations(observation: str) -> Dict:
             "error": "Pass only the observation text, not a full file rewrite. "
                      "Each call appends a single timestamped entry.",
         }
-    if re.search(r'---\s*\n\s*\[?\d{4}-', observation):
+    if _OBS_MULTI_ENTRY_RE.search(observation):
         return {
             "success": False,
             "error": "Pass only a single observation. Each call appends one timestamped entry.",
@@ -432,6 +489,7 @@ def update_observations(observation: str) -> Dict:
             content = existing.rstrip() + new_entry
 
         obs_path.write_text(content, encoding="utf-8")
+        _mark_memory_changed()
         entry_count = len(_parse_observation_entries(content)['entries'])
         return {"success": True, "entries": entry_count, "tokens": estimate_tokens(content)}
     except Exception as e:
@@ -483,7 +541,7 @@ def resolve_observation(identifier: str, reason: str) -> Dict:
 
     insert_idx = 0
     for j, line in enumerate(lines):
-        if re.match(r'^\[\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}\]', line):
+        if _OBS_TIMESTAMP_RE.match(line):
             insert_idx = j + 1
             break
 
@@ -494,6 +552,7 @@ def resolve_observation(identifier: str, reason: str) -> Dict:
 
     try:
         obs_path.write_text(content, encoding="utf-8")
+        _mark_memory_changed()
         return {"success": True, "resolved": entry['timestamp'] or identifier[:30]}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -668,6 +727,7 @@ def write_consolidated_observations(
 
         new_content = ''.join(parts) + "\n"
         obs_path.write_text(new_content, encoding="utf-8")
+        _mark_memory_changed()
 
         return {
             "success": True,
@@ -711,6 +771,7 @@ def update_soul(content: str, file: str = "soul") -> Dict:
     try:
         soul_dir.mkdir(parents=True, exist_ok=True)
         path.write_text(content + "\n", encoding="utf-8")
+        _mark_memory_changed()
         return {"success": True, "tokens": estimate_tokens(content)}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -780,6 +841,7 @@ def archive_memory(content: str, date: Optional[str] = None) -> Dict:
         sep = "\n\n---\n\n" if path.exists() and path.read_text(encoding="utf-8").strip() else ""
         with open(path, "a", encoding="utf-8") as f:
             f.write(sep + content.strip())
+        _mark_memory_changed()
         return {"success": True, "filepath": f"{ARCHIVE_FOLDER}/{date}/{ARCHIVE_CONVERSATIONS_FILE}"}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -901,6 +963,7 @@ def write_memory_file(path: str, content: str) -> Dict:
     try:
         file_path.parent.mkdir(parents=True, exist_ok=True)
         file_path.write_text((content or "").strip(), encoding="utf-8")
+        _mark_memory_changed()
         return {"success": True, "filepath": f"{path}.md"}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -1023,6 +1086,7 @@ def write_organized_memory(memory_structure: Dict) -> Dict:
                 continue
             (timelines_dir / f"{file_key}.md").write_text(content, encoding="utf-8")
 
+        _mark_memory_changed()
         return {"success": True}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -1067,6 +1131,7 @@ def add_goal(goal_description: str, timeline: str, goal_type: str = "current") -
             path.write_text(path.read_text(encoding="utf-8").rstrip() + entry, encoding="utf-8")
         else:
             path.write_text(f"# {'Current goals' if goal_type == 'current' else 'Future plans'}\n" + entry.strip(), encoding="utf-8")
+        _mark_memory_changed()
         return {"success": True, "filepath": f"{TIMELINES_FOLDER}/{filename}"}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -1,44 +1,192 @@
 # obsidian.py
+import functools
+import heapq
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from stat import S_ISREG
+from typing import Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
 
-from memory import MEMORY_FOLDER, SOUL_FOLDER, _get_vault_path as _memory_get_vault_path
+from memory import MEMORY_FOLDER, SOUL_FOLDER, _get_vault_path as _memory_get_vault_path, _mark_memory_changed
 
+# Worker threads used to overlap file reads during vault scans
+NOTE_READ_WORKERS = 8
 
-def _parse_frontmatter_tags(content: str) -> List[str]:
-    """Extract tags from YAML frontmatter"""
+# Parsed-note cache: path -> ((mtime_ns, size), note). Entries are reused while
+# the file is unchanged on disk; least recently used entries are evicted.
+NOTE_CACHE_MAX_ENTRIES = 2048
+_NOTE_CACHE: "OrderedDict[Path, tuple]" = OrderedDict()
+_NOTE_CACHE_LOCK = threading.Lock()
+
+# Match #tag but not ##heading
+_INLINE_TAG_RE = re.compile(r'(?:^|[^#\w])#([\w-]+)(?:[^\w-]|$)')
+
+# soul, soul/..., or .../soul (optionally .md), either slash direction, any case
+_SOUL_PATH_RE = re.compile(r'(?:soul(?:[\\/].*)?|.*[\\/]soul)(?:\.md)?', re.IGNORECASE | re.DOTALL)
+
+# Runs of whitespace, collapsed to one space in preview snippets
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Frontmatter block at the top of a note (group 1 is the YAML body)
+_FRONTMATTER_RE = re.compile(r'^---\s*\n(.*?)\n---', re.DOTALL)
+# Same block including its trailing newline, for stripping it from the body
+_FRONTMATTER_STRIP_RE = re.compile(r'^---\s*\n.*?\n---\s*\n', re.DOTALL)
+
+# (.*) keeps a bare "created:" line as an empty value rather than skipping it
+_YAML_TIMESTAMP_RE = re.compile(r'(created|updated):[ \t]*(.*)')
+_YAML_INLINE_TAGS_RE = re.compile(r'tags:\s*\[(.*?)\]')
+# Frontmatter keys whose "- item" block lists are collected
+_YAML_LIST_KEYS = ('tags', 'topics')
+
+
+def _read_note(md_file: Path) -> Optional[str]:
+    """Read a note as UTF-8. Returns None if it can't be read."""
+    try:
+        with open(md_file, 'r', encoding='utf-8') as f:
+            return f.read()
+    except (IOError, UnicodeDecodeError):
+        return None
+
+
+def _load_note(md_file: Path) -> Optional[Dict]:
+    """
+    Read and parse a note, reusing the cached parse while its mtime and size
+    are unchanged.
+
+    Returns dict with 'content', 'content_lower', 'tags', 'tags_lower' and
+    'metadata', or
+    None if the file can't be read. The returned dict is shared with the
+    cache and must not be mutated.
+    """
+    try:
+        stat = md_file.stat()
+    except OSError:
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    with _NOTE_CACHE_LOCK:
+        cached = _NOTE_CACHE.get(md_file)
+        if cached and cached[0] == stamp:
+            _NOTE_CACHE.move_to_end(md_file)
+            return cached[1]
+
+    content = _read_note(md_file)
+    if content is None:
+        return None
+    tags = _get_all_tags(content)
+    note = {
+        "content": content,
+        "content_lower": content.lower(),
+        "tags": tags,
+        "tags_lower": frozenset(t.lower() for t in tags),
+        "metadata": _parse_frontmatter_metadata(content),
+    }
+
+    with _NOTE_CACHE_LOCK:
+        _NOTE_CACHE[md_file] = (stamp, note)
+        _NOTE_CACHE.move_to_end(md_file)
+        while len(_NOTE_CACHE) > NOTE_CACHE_MAX_ENTRIES:
+            _NOTE_CACHE.popitem(last=False)
+    return note
+
+
+def _forget_note(md_file: Path) -> None:
+    """
+    Drop a note from the parse cache after writing or deleting it.
+
+    Also bumps memory_signature(), since note writes change the memory map
+    the cached system prompt is built from.
+    """
+    with _NOTE_CACHE_LOCK:
+        _NOTE_CACHE.pop(md_file, None)
+    _mark_memory_changed()
+
+
+def _load_notes(paths: List[Path]) -> Iterator[Tuple[Path, Optional[Dict]]]:
+    """
+    Load many notes via _load_note, yielding (path, note) in input order.
+
+    Reads are issued from a small thread pool so the per-file open/read
+    latency overlaps instead of being paid serially. Unreadable files
+    yield None.
+    """
+    if len(paths) < 2:
+        for path in paths:
+            yield path, _load_note(path)
+        return
+    with ThreadPoolExecutor(max_workers=NOTE_READ_WORKERS) as pool:
+        yield from zip(paths, pool.map(_load_note, paths))
+
+
+def _parse_yaml_lists(frontmatter: str) -> Dict[str, List[str]]:
+    """
+    Collect "- item" lines under each 'tags:' / 'topics:' key in one pass.
+
+    A key line (at any indent, inline value or not) opens its list. Indented
+    lines that aren't items (comments, whitespace) are skipped; the first
+    unindented non-item line closes it.
+    """
+    lists = {key: [] for key in _YAML_LIST_KEYS}
+    open_keys = set()
+    for line in frontmatter.split('\n'):
+        stripped = line.strip()
+        for key in _YAML_LIST_KEYS:
+            if stripped.startswith(key + ':'):
+                open_keys.add(key)
+            elif key in open_keys:
+                if stripped.startswith('- '):
+                    lists[key].append(stripped[2:].strip())
+                elif not line.startswith((' ', '\t')):
+                    open_keys.discard(key)
+    return lists
+
+
+def _parse_frontmatter(content: str) -> Dict:
+    """
+    Parse a note's frontmatter in one pass.
+
+    Returns a dict with whichever of 'created', 'updated', 'tags' and 'topics'
+    are present. Notes without frontmatter return an empty dict.
+    """
+    parsed = {}
+    frontmatter_match = _FRONTMATTER_RE.match(content)
+    if not frontmatter_match:
+        return parsed
+    frontmatter = frontmatter_match.group(1)
+
+    for key, value in _YAML_TIMESTAMP_RE.findall(frontmatter):
+        parsed.setdefault(key, value.strip())
+
+    lists = _parse_yaml_lists(frontmatter)
+
+    # Match tags in various formats: tags: [tag1, tag2] or tags:\n  - tag1
     tags = []
-    frontmatter_match = re.match(r'^---\s*\n(.*?)\n---', content, re.DOTALL)
-
-    if frontmatter_match:
-        frontmatter = frontmatter_match.group(1)
-        # Match tags in various formats: tags: [tag1, tag2] or tags:\n  - tag1
-        tag_lines = re.findall(r'tags:\s*\[(.*?)\]', frontmatter)
-        if tag_lines:
-            for tag_line in tag_lines:
-                tags.extend([t.strip().strip('"\'') for t in tag_line.split(',')])
-
-        # Also match list format
-        in_tags_section = False
-        for line in frontmatter.split('\n'):
-            if line.strip().startswith('tags:'):
-                in_tags_section = True
-                continue
-            if in_tags_section:
-                if line.strip().startswith('- '):
-                    tags.append(line.strip()[2:].strip())
-                elif not line.startswith(' ') and not line.startswith('\t'):
-                    in_tags_section = False
+    for tag_line in _YAML_INLINE_TAGS_RE.findall(frontmatter):
+        tags.extend(t.strip().strip('"\'') for t in tag_line.split(','))
+    tags.extend(lists.get('tags', []))
+    if tags:
+        parsed['tags'] = tags
 
-    return tags
+    if lists.get('topics'):
+        parsed['topics'] = lists['topics']
+
+    return parsed
+
+
+def _parse_frontmatter_tags(content: str) -> List[str]:
+    """Extract tags from YAML frontmatter"""
+    return _parse_frontmatter(content).get('tags', [])
 
 
 def _parse_inline_tags(content: str) -> List[str]:
     """Extract inline #tags from content"""
-    # Match #tag but not ##heading
-    return re.findall(r'(?:^|[^#\w])#([\w-]+)(?:[^\w-]|$)', content)
+    # Notes without any '#' can't carry inline tags; skip the regex scan
+    if '#' not in content:
+        return []
+    return _INLINE_TAG_RE.findall(content)
 
 
 def _get_all_tags(content: str) -> List[str]:
@@ -51,28 +199,20 @@ def _get_all_tags(content: str) -> List[str]:
 
 def _get_preview_snippet(content: str, match_pos: int, context_length: int = 100) -> str:
     """Extract a preview snippet around a match position"""
-    start = max(0, match_pos - context_length // 2)
-    end = min(len(content), match_pos + context_length // 2)
+    half = context_length // 2
+    start = max(0, match_pos - half)
+    end = min(len(content), match_pos + half)
 
-    snippet = content[start:end]
+    # Normalize whitespace in a single regex pass
+    snippet = _WHITESPACE_RE.sub(' ', content[start:end]).strip()
 
-    # Clean up the snippet
-    snippet = ' '.join(snippet.split())  # Normalize whitespace
+    prefix = '...' if start > 0 else ''
+    suffix = '...' if end < len(content) else ''
+    return f"{prefix}{snippet}{suffix}"
 
-    if start > 0:
-        snippet = '...' + snippet
-    if end < len(content):
-        snippet = snippet + '...'
-
-    return snippet
-
-
-def _calculate_relevance_score(filepath: Path, title: str, content: str, query: str) -> tuple:
-    """Calculate relevance score for sorting. Returns (score, match_type)"""
-    query_lower = query.lower()
-    title_lower = title.lower()
-    content_lower = content.lower()
 
+def _calculate_relevance_score(title_lower: str, content_lower: str, query_lower: str) -> tuple:
+    """Calculate relevance score for sorting from lowercased inputs. Returns (score, match_type)"""
     # Title exact match: highest priority
     if query_lower == title_lower:
         return (1000, "title_exact")
@@ -117,76 +257,59 @@ def search_vault(query: str, tags: Optional[List[str]] = None, folder: Optional[
             "results": []
         }
 
-    results = []
+    # Matches are kept as (score, match_type, md_file, note, match_pos) tuples;
+    # result dicts and previews are only built for the top results.
+    matches = []
     query_lower = query.lower()
-    tags_lower = [t.lower() for t in tags] if tags else []
+    tags_lower = {t.lower() for t in tags} if tags else set()
 
     # Search all markdown files
     try:
-        for md_file in search_root.rglob("*.md"):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                # Extract title (filename without extension)
-                title = md_file.stem
-
-                # Get all tags from the note
-                note_tags = _get_all_tags(content)
-
-                # Filter by tags if specified
-                if tags_lower:
-                    note_tags_lower = [t.lower() for t in note_tags]
-                    if not any(tag in note_tags_lower for tag in tags_lower):
-                        continue
-
-                # Search for query in title or content
-                title_lower = title.lower()
-                content_lower = content.lower()
-
-                if query_lower not in title_lower and query_lower not in content_lower:
-                    continue
+        for md_file, note in _load_notes(list(search_root.rglob("*.md"))):
+            # Skip files that can't be read
+            if note is None:
+                continue
 
-                # Calculate relevance score
-                score, match_type = _calculate_relevance_score(md_file, title, content, query)
-
-                # Find match position for preview
-                match_pos = content_lower.find(query_lower)
-                if match_pos == -1:
-                    # Must be in title
-                    preview = content[:100].strip()
-                else:
-                    preview = _get_preview_snippet(content, match_pos)
-
-                # Get relative path from vault root
-                relative_path = md_file.relative_to(vault_path)
-
-                results.append({
-                    "filepath": str(relative_path),
-                    "title": title,
-                    "preview": preview,
-                    "match_type": match_type,
-                    "tags": note_tags,
-                    "score": score
-                })
-
-            except (IOError, UnicodeDecodeError) as e:
-                # Skip files that can't be read
+            # Filter by tags if specified
+            if tags_lower and tags_lower.isdisjoint(note["tags_lower"]):
                 continue
 
-        # Sort by relevance score (highest first)
-        results.sort(key=lambda x: x["score"], reverse=True)
+            # Search for query in title or content
+            title_lower = md_file.stem.lower()
+            content_lower = note["content_lower"]
 
-        # Return top 10 results
-        top_results = results[:10]
+            # One scan answers both "is it in the content" and "where" (for the preview)
+            match_pos = content_lower.find(query_lower)
+            if match_pos == -1 and query_lower not in title_lower:
+                continue
 
-        # Remove score before returning (internal use only)
-        for r in top_results:
-            del r["score"]
+            # Calculate relevance score
+            score, match_type = _calculate_relevance_score(title_lower, content_lower, query_lower)
+            matches.append((score, match_type, md_file, note, match_pos))
+
+        # Top 10 by relevance score (highest first; ties keep scan order)
+        top_matches = heapq.nlargest(10, matches, key=lambda m: m[0])
+
+        top_results = []
+        for score, match_type, md_file, note, match_pos in top_matches:
+            content = note["content"]
+            if match_pos == -1:
+                # Must be in title
+                preview = content[:100].strip()
+            else:
+                preview = _get_preview_snippet(content, match_pos)
+
+            top_results.append({
+                "filepath": str(md_file.relative_to(vault_path)),
+                "title": md_file.stem,
+                "preview": preview,
+                "match_type": match_type,
+                "tags": list(note["tags"]),
+            })
 
         return {
             "results": top_results,
-            "total_found": len(results)
+            "total_found": len(matches)
         }
 
     except Exception as e:
@@ -200,6 +323,12 @@ def search_vault(query: str, tags: Optional[List[str]] = None, folder: Optional[
 # AI MEMORY MANAGEMENT
 # ============================================================================
 
+@functools.lru_cache(maxsize=4)
+def _resolved_memory_folder(vault_path: Path) -> Path:
+    """Resolved AI Memory folder for a vault (cached — resolve() stats every path component)."""
+    return (vault_path / MEMORY_FOLDER).resolve()
+
+
 def _validate_memory_path(filename: str, vault_path: Path) -> tuple:
     """
     Validate that a filename is safe and within AI Memory folder.
@@ -220,7 +349,7 @@ def _validate_memory_path(filename: str, vault_path: Path) -> tuple:
     # Resolve to absolute path
     try:
         target_resolved = target_path.resolve()
-        memory_resolved = memory_folder.resolve()
+        memory_resolved = _resolved_memory_folder(vault_path)
     except Exception as e:
         return False, f"Path resolution error: {str(e)}", None
 
@@ -259,39 +388,9 @@ def _format_frontmatter(created: str = None, updated: str = None, topics: List[s
 
 
 def _parse_frontmatter_metadata(content: str) -> Dict:
-    """Extract metadata from frontmatter"""
-    metadata = {}
-    frontmatter_match = re.match(r'^---\s*\n(.*?)\n---', content, re.DOTALL)
-
-    if frontmatter_match:
-        frontmatter = frontmatter_match.group(1)
-
-        # Extract created/updated
-        created_match = re.search(r'created:\s*(.+)', frontmatter)
-        if created_match:
-            metadata['created'] = created_match.group(1).strip()
-
-        updated_match = re.search(r'updated:\s*(.+)', frontmatter)
-        if updated_match:
-            metadata['updated'] = updated_match.group(1).strip()
-
-        # Extract topics
-        topics = []
-        in_topics_section = False
-        for line in frontmatter.split('\n'):
-            if line.strip().startswith('topics:'):
-                in_topics_section = True
-                continue
-            if in_topics_section:
-                if line.strip().startswith('- '):
-                    topics.append(line.strip()[2:].strip())
-                elif not line.startswith(' ') and not line.startswith('\t'):
-                    in_topics_section = False
-
-        if topics:
-            metadata['topics'] = topics
-
-    return metadata
+    """Extract metadata (created, updated, topics) from frontmatter"""
+    parsed = _parse_frontmatter(content)
+    return {key: parsed[key] for key in ('created', 'updated', 'topics') if key in parsed}
 
 
 def _get_vault_path() -> tuple:
@@ -304,8 +403,7 @@ def _get_vault_path() -> tuple:
 
 def _is_soul_path(filename: str) -> bool:
     """Check if a filename resolves to the soul/ directory (Memoria's protected space)."""
-    normalized = filename.strip().lower().replace("\\", "/").removesuffix(".md")
-    return normalized == "soul" or normalized.startswith("soul/") or normalized.endswith("/soul")
+    return _SOUL_PATH_RE.fullmatch(filename.strip()) is not None
 
 
 def create_memory_note(title: str, content: str, subfolder: str = None, topics: List[str] = None) -> Dict:
@@ -355,8 +453,8 @@ def create_memory_note(title: str, content: str, subfolder: str = None, topics:
 
     # Write file
     try:
-        with open(target_path, 'w', encoding='utf-8') as f:
-            f.write(frontmatter + content)
+        target_path.write_text(frontmatter + content, encoding='utf-8')
+        _forget_note(target_path)
 
         relative_path = target_path.relative_to(vault_path)
         return {
@@ -391,26 +489,24 @@ def read_memory_note(filename: str) -> Dict:
     if not target_path.exists():
         return {"success": False, "error": f"Note not found: {filename}"}
 
-    # Read file
-    try:
-        with open(target_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+    # Read through the parse cache: re-reading an unchanged note skips the
+    # file read and frontmatter parse (also shared with search_vault)
+    note = _load_note(target_path)
+    if note is None:
+        return {"success": False, "error": f"Failed to read file: {filename}"}
+    content = note["content"]
 
-        # Parse metadata
-        metadata = _parse_frontmatter_metadata(content)
+    # Remove frontmatter from content for display
+    content_without_frontmatter = _FRONTMATTER_STRIP_RE.sub('', content)
 
-        # Remove frontmatter from content for display
-        content_without_frontmatter = re.sub(r'^---\s*\n.*?\n---\s*\n', '', content, flags=re.DOTALL)
-
-        return {
-            "success": True,
-            "content": content_without_frontmatter,
-            "full_content": content,
-            "metadata": metadata,
-            "filepath": str(target_path.relative_to(vault_path))
-        }
-    except Exception as e:
-        return {"success": False, "error": f"Failed to read file: {str(e)}"}
+    return {
+        "success": True,
+        "content": content_without_frontmatter,
+        "full_content": content,
+        # Copy list values too: the cached metadata must not be mutated
+        "metadata": {k: list(v) if isinstance(v, list) else v for k, v in note["metadata"].items()},
+        "filepath": str(target_path.relative_to(vault_path))
+    }
 
 
 def update_memory_note(filename: str, new_content: str, topics: List[str] = None, append: bool = False) -> Dict:
@@ -462,14 +558,14 @@ def update_memory_note(filename: str, new_content: str, topics: List[str] = None
 
         if append:
             # Remove old frontmatter from existing content, then append
-            body = re.sub(r'^---\s*\n.*?\n---\s*\n', '', old_content, flags=re.DOTALL)
+            body = _FRONTMATTER_STRIP_RE.sub('', old_content)
             final_body = body + "\n\n" + new_content
         else:
             final_body = new_content
 
         # Write updated file
-        with open(target_path, 'w', encoding='utf-8') as f:
-            f.write(frontmatter + final_body)
+        target_path.write_text(frontmatter + final_body, encoding='utf-8')
+        _forget_note(target_path)
 
         relative_path = target_path.relative_to(vault_path)
         verb = "Appended to" if append else "Updated"
@@ -487,15 +583,20 @@ def append_to_memory_note(filename: str, content: str) -> Dict:
     return update_memory_note(filename, content, append=True)
 
 
-def list_memory_notes(subfolder: str = None) -> Dict:
+def list_memory_notes(subfolder: str = None, include_topics: bool = False) -> Dict:
     """
-    List all notes in AI Memory/ folder.
+    List all notes in AI Memory/ folder, most recently modified first.
+
+    'updated' comes from the file's mtime, so a plain listing only stats
+    each file. Frontmatter is read only when include_topics is set.
 
     Args:
         subfolder: Optional subfolder to list (e.g., "topics")
+        include_topics: If True, also read each note's 'created' and 'topics'
 
     Returns:
-        dict with 'success', 'notes' (list of dicts with filepath, title, metadata), or 'error'
+        dict with 'success', 'notes' (list of dicts with filepath, title, updated
+        and, with include_topics, created and topics), or 'error'
     """
     vault_path, error = _get_vault_path()
     if error:
@@ -516,7 +617,7 @@ def list_memory_notes(subfolder: str = None) -> Dict:
 
         # Verify it's within AI Memory folder
         try:
-            search_path.relative_to(memory_folder.resolve())
+            search_path.relative_to(_resolved_memory_folder(vault_path))
         except ValueError:
             return {"success": False, "error": "Path escapes AI Memory folder"}
     else:
@@ -526,7 +627,7 @@ def list_memory_notes(subfolder: str = None) -> Dict:
         return {"success": True, "notes": [], "message": f"Subfolder not found: {subfolder}"}
 
     # List all markdown files (excluding soul.md — Memoria's private self-concept)
-    notes = []
+    listed = []
     try:
         for md_file in search_path.rglob("*.md"):
             try:
@@ -536,24 +637,33 @@ def list_memory_notes(subfolder: str = None) -> Dict:
                 if rel_str.startswith(SOUL_FOLDER + "/") or rel_str == SOUL_FOLDER:
                     continue
 
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                metadata = _parse_frontmatter_metadata(content)
-
-                notes.append({
-                    "filepath": str(relative_path),
-                    "title": md_file.stem,
-                    "created": metadata.get('created'),
-                    "updated": metadata.get('updated'),
-                    "topics": metadata.get('topics', [])
-                })
-            except Exception:
-                # Skip files that can't be read
+                st = md_file.stat()
+            except (ValueError, OSError):
+                # Skip paths outside AI Memory/ and files that vanished or can't be stat'ed
                 continue
-
-        # Sort by updated date (most recent first); treat None as ''
-        notes.sort(key=lambda x: x.get('updated') or '', reverse=True)
+            # rglob also yields directories whose name ends in .md
+            if not S_ISREG(st.st_mode):
+                continue
+            mtime = st.st_mtime
+
+            listed.append((mtime, {
+                "filepath": str(relative_path),
+                "title": md_file.stem,
+                "updated": datetime.fromtimestamp(mtime).isoformat(timespec="seconds"),
+            }))
+
+        # Sort by last modification (most recent first)
+        listed.sort(key=lambda item: item[0], reverse=True)
+        notes = [entry for _, entry in listed]
+
+        # Frontmatter is only read when topics are requested
+        if include_topics:
+            memory_folder_path = vault_path / MEMORY_FOLDER
+            paths = [memory_folder_path / n["filepath"] for n in notes]
+            for entry, (_, note) in zip(notes, _load_notes(paths)):
+                metadata = note["metadata"] if note else {}
+                entry["created"] = metadata.get('created')
+                entry["topics"] = list(metadata.get('topics', []))
 
         return {
             "success": True,
@@ -594,6 +704,7 @@ def delete_memory_note(filename: str) -> Dict:
     # Delete file
     try:
         target_path.unlink()
+        _forget_note(target_path)
         return {
             "success": True,
             "message": f"Deleted note: {filename}"
@@ -4,9 +4,19 @@ Prompt templates for the Local Memory Assistant.
 All system prompts, instruction templates, and prompt-building functions.
 """
 
+import sys
+from collections import deque
 from datetime import datetime
+from typing import Optional
 
-from memory import CORE_MEMORY_MAX_TOKENS, build_memory_map, read_soul
+from memory import CORE_MEMORY_MAX_TOKENS, build_memory_map, estimate_tokens, memory_signature, read_soul
+
+# Last built system prompt as (key, segments, prompt); see build_system_prompt_segments
+_system_prompt_cache: Optional[tuple] = None
+
+# Starts the volatile tail of the system prompt. Everything before it only
+# changes with memory, so providers can cache it as a prefix.
+DATE_LINE_PREFIX = "\n\nCurrent date and time: "
 
 # --- Main chat ---
 SYSTEM_PROMPT = """You are a personal assistant with persistent memory. You know this person - act like it.
@@ -120,7 +130,8 @@ Update your soul files (observations, opinions, unresolved) when genuine thought
 about this person. This isn't a task — it's paying attention."""
 
 # --- Consolidation ---
-CONSOLIDATION_SYSTEM_PROMPT = """The conversation is ending. Your only job is to consolidate memory. Do not chat or say goodbye.
+# Concatenated once at import and interned, so every consolidation reuses the same object
+CONSOLIDATION_SYSTEM_PROMPT = sys.intern("""The conversation is ending. Your only job is to consolidate memory. Do not chat or say goodbye.
 
 1. Read current core memory with read_core_memory.
 2. Summarize what was important in this conversation.
@@ -132,7 +143,32 @@ CONSOLIDATION_SYSTEM_PROMPT = """The conversation is ending. Your only job is to
 Note: Observation consolidation (summarizing old entries) is handled automatically after this pass. Do not manually rewrite observations.md.
 
 Tools available: read_core_memory, update_core_memory, read_memory, write_memory, archive_memory, read_archive, update_soul.
-Read before writing. When done, respond without further tool calls."""
+Read before writing. When done, respond without further tool calls.""")
+
+# Estimated once here so callers can make cache and budget decisions without
+# re-counting the static prompts on every request
+SYSTEM_PROMPT_TOKENS = estimate_tokens(SYSTEM_PROMPT)
+CONSOLIDATION_PROMPT_TOKENS = estimate_tokens(CONSOLIDATION_SYSTEM_PROMPT)
+
+
+# Indexed by "was the content truncated?"
+_TRUNCATION_SUFFIX = ("", "...")
+
+
+def _summarize_chat_message(m: dict, max_content_len: int) -> str:
+    """One-line "role: content" summary of a message, or "" if it has nothing to show."""
+    role = m.get("role", "")
+    # Compress tool messages — consolidation doesn't need full tool results
+    if role == "tool":
+        return f"tool: [{m.get('name', 'tool')} result]"
+    content = (m.get("content") or "").strip()
+    if not content:
+        tool_calls = m.get("tool_calls")
+        if not tool_calls:
+            return ""
+        names = ", ".join(tc.get("function", {}).get("name", "?") for tc in tool_calls)
+        content = f"[called {names}]"
+    return f"{role}: {content[:max_content_len]}{_TRUNCATION_SUFFIX[len(content) > max_content_len]}"
 
 
 def build_consolidation_user_message(conversation_messages: list, current_memory: str) -> str:
@@ -144,22 +180,11 @@ def build_consolidation_user_message(conversation_messages: list, current_memory
     """
     max_messages = 24   # ~12 turns of user/assistant, enough context for consolidation
     max_content_len = 300
-    non_system = [m for m in conversation_messages if m.get("role") != "system"]
-    recent = non_system[-max_messages:] if len(non_system) > max_messages else non_system
-    conv_summary = []
-    for m in recent:
-        role = m.get("role", "")
-        content = (m.get("content") or "").strip()
-        # Compress tool messages — consolidation doesn't need full tool results
-        if role == "tool":
-            tool_name = m.get("name", "tool")
-            content = f"[{tool_name} result]"
-        elif not content and m.get("tool_calls"):
-            names = ", ".join(tc.get("function", {}).get("name", "?") for tc in m.get("tool_calls", []))
-            content = f"[called {names}]"
-        if content:
-            conv_summary.append(f"{role}: {content[:max_content_len]}{'...' if len(content) > max_content_len else ''}")
-    conversation_snippet = "\n".join(conv_summary) if conv_summary else "(no messages)"
+    # Bounded buffer: only the last max_messages non-system messages are ever held
+    recent = deque((m for m in conversation_messages if m.get("role") != "system"), maxlen=max_messages)
+    conversation_snippet = "\n".join(
+        line for line in (_summarize_chat_message(m, max_content_len) for m in recent) if line
+    ) or "(no messages)"
 
     soul_content = read_soul()
 
@@ -181,25 +206,66 @@ Conversation context (recent messages):
 ---"""
 
 
-def build_system_prompt() -> str:
+def _build_system_prompt() -> tuple:
     """
-    Build the full system prompt with soul files and a live memory map injected.
-    Call this at conversation start, not at import time, so the map
-    reflects the current vault state.
+    Build (segments, prompt) for the system prompt, where prompt is the
+    segments joined.
 
-    Order: behavioral instructions → soul → memory map
+    The result is cached and reused while the minute and memory_signature()
+    are unchanged, so per-turn refreshes skip re-reading soul files and
+    re-walking the vault.
     """
-    parts = [SYSTEM_PROMPT]
-    parts.append(f"\n\nCurrent date and time: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    global _system_prompt_cache
+    now = datetime.now().strftime('%Y-%m-%d %H:%M')
+    cache_key = (now, memory_signature())
+    if _system_prompt_cache and _system_prompt_cache[0] == cache_key:
+        return _system_prompt_cache[1:]
+
+    segments = [("instructions", SYSTEM_PROMPT, True)]
 
     # Inject soul files — Memoria's internal world
     soul_content = read_soul()
     if soul_content:
-        parts.append(f"\n\n## Who I Am\n\n{soul_content}")
+        segments.append(("soul", f"\n\n## Who I Am\n\n{soul_content}", True))
 
     # Inject memory map
     memory_map = build_memory_map()
     if memory_map:
-        parts.append(f"\n\n{memory_map}")
+        segments.append(("memory_map", f"\n\n{memory_map}", True))
+
+    segments.append(("date", f"{DATE_LINE_PREFIX}{now}", False))
+
+    segments = tuple(segments)
+    prompt = "".join(text for _, text, _ in segments)
+    _system_prompt_cache = (cache_key, segments, prompt)
+    return segments, prompt
 
-    return "".join(parts)
+
+def build_system_prompt_segments() -> tuple:
+    """
+    Build the system prompt as ordered (segment_id, text, reusable) tuples.
+
+    Segment ids are stable across builds: "instructions" (always exactly
+    SYSTEM_PROMPT), "soul", "memory_map" and "date". Reusable segments only
+    change when memory does, so a prefix-caching backend can keep them warm
+    (see llm.with_cache_breakpoints); "date" changes every minute and always
+    comes last. Segments with nothing to show (no soul, empty map) are left
+    out. Shares build_system_prompt()'s cache.
+    """
+    segments, _ = _build_system_prompt()
+    return segments
+
+
+def build_system_prompt() -> str:
+    """
+    Build the full system prompt with soul files and a live memory map injected.
+    Call this at conversation start, not at import time, so the map
+    reflects the current vault state.
+
+    Order: behavioral instructions → soul → memory map → current date and time
+
+    The date goes last so it doesn't invalidate the cacheable prefix every minute.
+    This is build_system_prompt_segments() joined, and shares its cache.
+    """
+    _, prompt = _build_system_prompt()
+    return prompt
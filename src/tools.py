@@ -14,6 +14,7 @@ Tool count: 15
 """
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 from memory import (
     read_core_memory,
     update_core_memory,
@@ -35,6 +36,13 @@ from obsidian import (
     delete_memory_note,
 )
 
+# orjson is an optional speedup for parsing tool arguments; its JSONDecodeError
+# subclasses json.JSONDecodeError, so both parsers share one except clause.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 # --- Tool definitions (13 tools) ---
 
 READ_CORE_MEMORY_TOOL = {
@@ -246,13 +254,17 @@ LIST_MEMORY_NOTES_TOOL = {
     "type": "function",
     "function": {
         "name": "list_memory_notes",
-        "description": "List all notes in AI Memory/ folder (for discovering notes not shown in the memory map).",
+        "description": "List all notes in AI Memory/ folder (for discovering notes not shown in the memory map). Returns each note's path and last-modified time; topics are only included when include_topics is true.",
         "parameters": {
             "type": "object",
             "properties": {
                 "subfolder": {
                     "type": "string",
                     "description": "Optional subfolder to list (e.g., 'topics')"
+                },
+                "include_topics": {
+                    "type": "boolean",
+                    "description": "If true, also show each note's topic tags and created date (slower for large folders). Default false."
                 }
             },
             "required": []
@@ -353,7 +365,7 @@ RESOLVE_OBSERVATION_TOOL = {
 
 # --- Tool lists for different contexts ---
 
-CHAT_TOOLS = [
+CHAT_TOOLS = (
     READ_CORE_MEMORY_TOOL,
     UPDATE_CORE_MEMORY_TOOL,
     READ_MEMORY_TOOL,
@@ -369,9 +381,9 @@ CHAT_TOOLS = [
     UPDATE_SOUL_TOOL,
     UPDATE_OBSERVATIONS_TOOL,
     RESOLVE_OBSERVATION_TOOL,
-]
+)
 
-CONSOLIDATION_TOOLS = [
+CONSOLIDATION_TOOLS = (
     READ_CORE_MEMORY_TOOL,
     UPDATE_CORE_MEMORY_TOOL,
     READ_MEMORY_TOOL,
@@ -379,7 +391,7 @@ CONSOLIDATION_TOOLS = [
     ARCHIVE_MEMORY_TOOL,
     READ_ARCHIVE_TOOL,
     UPDATE_SOUL_TOOL,
-]
+)
 
 
 # --- Argument parsing ---
@@ -391,8 +403,11 @@ def parse_tool_arguments(tool_call: dict) -> dict:
     if isinstance(raw, dict):
         return raw
     if isinstance(raw, str):
+        # No-argument tools (read_core_memory, read_archive, ...) skip parsing entirely
+        if not raw or raw == "{}":
+            return {}
         try:
-            return json.loads(raw)
+            return _json_loads(raw)
         except json.JSONDecodeError:
             return {}
     return {}
@@ -400,6 +415,11 @@ def parse_tool_arguments(tool_call: dict) -> dict:
 
 # --- Tool handlers ---
 
+def _error_message(result: dict) -> str:
+    """Tool-facing error string for a failed memory operation result."""
+    return f"Error: {result.get('error', 'Unknown error')}"
+
+
 def _handle_read_core_memory(args):
     content = read_core_memory()
     return content if content else "(Core memory is empty.)"
@@ -411,7 +431,7 @@ def _handle_update_core_memory(args):
     result = update_core_memory(content)
     if result.get("success"):
         return f"Core memory updated ({result.get('tokens', 0)} tokens)."
-    return f"Error: {result.get('error', 'Unknown error')}"
+    return _error_message(result)
 
 
 def _handle_read_memory(args):
@@ -434,7 +454,7 @@ def _handle_write_memory(args):
     result = write_memory_file(path, content)
     if result.get("success"):
         return f"Updated {result.get('filepath', path)}."
-    return f"Error: {result.get('error', 'Unknown error')}"
+    return _error_message(result)
 
 
 def _handle_archive_memory(args):
@@ -443,7 +463,7 @@ def _handle_archive_memory(args):
     result = archive_memory(content, date=date)
     if result.get("success"):
         return f"Archived to {result.get('filepath', 'archive')}."
-    return f"Error: {result.get('error', 'Unknown error')}"
+    return _error_message(result)
 
 
 def _handle_read_archive(args):
@@ -543,7 +563,8 @@ def _handle_update_memory_note(args):
 
 def _handle_list_memory_notes(args):
     subfolder = args.get("subfolder")
-    result = list_memory_notes(subfolder=subfolder)
+    include_topics = args.get("include_topics") is True
+    result = list_memory_notes(subfolder=subfolder, include_topics=include_topics)
     if result.get("success"):
         notes = result.get("notes", [])
         if not notes:
@@ -579,7 +600,7 @@ def _handle_update_soul(args):
     result = update_soul(content, file=file)
     if result.get("success"):
         return f"Soul/{file} updated ({result.get('tokens', 0)} tokens)."
-    return f"Error: {result.get('error', 'Unknown error')}"
+    return _error_message(result)
 
 
 def _handle_update_observations(args):
@@ -589,7 +610,7 @@ def _handle_update_observations(args):
     result = update_observations(str(observation))
     if result.get("success"):
         return f"Observation logged ({result.get('entries', 0)} entries, {result.get('tokens', 0)} tokens)."
-    return f"Error: {result.get('error', 'Unknown error')}"
+    return _error_message(result)
 
 
 def _handle_resolve_observation(args):
@@ -602,7 +623,7 @@ def _handle_resolve_observation(args):
     result = resolve_observation(str(identifier), str(reason))
     if result.get("success"):
         return f"Observation resolved: {result.get('resolved', identifier)}"
-    return f"Error: {result.get('error', 'Unknown error')}"
+    return _error_message(result)
 
 
 # --- Dispatch table ---
@@ -632,3 +653,29 @@ def execute_tool(func_name, args):
     if handler:
         return handler(args)
     return f"Unknown tool: {func_name}"
+
+
+# Tools that only read the vault; several of them in one turn are independent
+# and can run concurrently (see execute_tools_concurrently)
+READ_ONLY_TOOLS = frozenset({
+    "read_core_memory",
+    "read_memory",
+    "read_archive",
+    "search_vault",
+    "read_memory_note",
+    "list_memory_notes",
+})
+TOOL_BATCH_WORKERS = 8
+
+
+def execute_tools_concurrently(calls: list) -> list:
+    """
+    Execute (func_name, args) calls on a thread pool, returning results in order.
+
+    Only for calls that are all in READ_ONLY_TOOLS: file reads release the
+    GIL, so a turn that reads several files or searches overlaps its I/O.
+    Turns that write must stay sequential, since later calls may read what
+    earlier ones wrote.
+    """
+    with ThreadPoolExecutor(max_workers=min(len(calls), TOOL_BATCH_WORKERS)) as pool:
+        return list(pool.map(lambda call: execute_tool(*call), calls))
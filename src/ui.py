@@ -39,6 +39,9 @@ STYLE_TOOL_RESULT = STYLE_DIM_ACCENT
 STYLE_THINKING = STYLE_DIM_ACCENT
 STYLE_PROMPT = STYLE_ACCENT
 
+# Assistant label printed before every response; built once and reused
+_MEM_LABEL = Text("mem", style=STYLE_DIM_ACCENT)
+
 # ── Tool descriptions ─────────────────────────────────────────────────
 
 TOOL_SPINNER_TEXT = {
@@ -146,7 +149,7 @@ class StreamingDisplay:
             self._content_started = True
             self._spinner_live.stop()
             console.print()
-            console.print(Text("mem", style="dim #00D9FF"))
+            console.print(_MEM_LABEL)
             self._content_live = Live(
                 renderable,
                 console=console,
@@ -224,7 +227,7 @@ def display_response(content: str):
     if not content:
         return
     console.print()
-    console.print(Text("mem", style="dim #00D9FF"))
+    console.print(_MEM_LABEL)
     console.print(Markdown(content))
 
 
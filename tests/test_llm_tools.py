@@ -3,6 +3,7 @@ Tests for LLM tool calls: parse_tool_arguments and execute_tool.
 Uses a temporary vault directory so no real data is touched.
 """
 import json
+import re
 import sys
 from pathlib import Path
 from unittest.mock import patch
@@ -14,6 +15,14 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
 
 from memory import ensure_memory_structure, write_organized_memory, delete_ai_memory_folder, reset_soul_folder
 
+# Observation entry timestamp, e.g. "[2026-02-14 09:30]"
+_OBS_TIMESTAMP_RE = re.compile(r"\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2})\]")
+
+
+def _tool_names(tools):
+    """Function names offered by a tool-schema list (CHAT_TOOLS, CONSOLIDATION_TOOLS)."""
+    return {t["function"]["name"] for t in tools}
+
 
 @pytest.fixture
 def vault_path(tmp_path, monkeypatch):
@@ -24,6 +33,12 @@ def vault_path(tmp_path, monkeypatch):
     return tmp_path
 
 
+@pytest.fixture
+def obs_path(vault_path):
+    """The temp vault's soul/observations.md."""
+    return vault_path / "AI Memory" / "soul" / "observations.md"
+
+
 @pytest.fixture
 def execute_tool(vault_path):
     """Import execute_tool after env is set so it uses the temp vault."""
@@ -31,7 +46,7 @@ def execute_tool(vault_path):
     return _execute_tool
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def parse_tool_arguments():
     from tools import parse_tool_arguments
     return parse_tool_arguments
@@ -56,6 +71,18 @@ def test_parse_tool_arguments_empty(parse_tool_arguments):
     assert parse_tool_arguments({"function": {"arguments": "{}"}}) == {}
 
 
+def test_parse_tool_arguments_malformed(parse_tool_arguments):
+    assert parse_tool_arguments({"function": {"arguments": '{"a": 1'}}) == {}
+
+
+def test_parse_tool_arguments_repeat_returns_fresh_dict(parse_tool_arguments):
+    tool_call = {"function": {"name": "foo", "arguments": '{"path": "context/work", "topics": ["a"]}'}}
+    first = parse_tool_arguments(tool_call)
+    first["path"] = "changed"
+    first["topics"].append("POLLUTED")
+    assert parse_tool_arguments(tool_call) == {"path": "context/work", "topics": ["a"]}
+
+
 # --- read_core_memory ---
 
 
@@ -141,16 +168,18 @@ def test_write_memory_creates_file(execute_tool, vault_path):
     assert (vault_path / "AI Memory" / "context" / "life" / "finances.md").exists()
 
 
-def test_write_memory_blocks_core(execute_tool, vault_path):
-    """Cannot overwrite core memory via write_memory (must use update_core_memory)."""
-    out = execute_tool("write_memory", {"path": "core-memory", "content": "Sneaky."})
-    assert "Error" in out and "core" in out.lower()
-
-
-def test_write_memory_blocks_archive(execute_tool, vault_path):
-    """Cannot write to archive via write_memory (must use archive_memory)."""
-    out = execute_tool("write_memory", {"path": "archive/2026-01/conversations", "content": "Sneaky."})
-    assert "Error" in out and "archive" in out.lower()
+@pytest.mark.parametrize(
+    "path,needle",
+    [
+        ("core-memory", "core"),
+        ("archive/2026-01/conversations", "archive"),
+    ],
+    ids=["core", "archive"],
+)
+def test_write_memory_blocks_reserved_paths(execute_tool, vault_path, path, needle):
+    """Core memory and archive have their own tools; write_memory must refuse them."""
+    out = execute_tool("write_memory", {"path": path, "content": "Sneaky."})
+    assert "Error" in out and needle in out.lower()
 
 
 def test_write_memory_path_traversal(execute_tool, vault_path):
@@ -211,6 +240,117 @@ def test_search_vault_with_query(execute_tool, vault_path):
     assert "No notes found" in out or "Found" in out
 
 
+def test_search_vault_finds_notes(execute_tool, vault_path):
+    """Matches across several notes are found and ranked by relevance."""
+    notes_dir = vault_path / "Notes"
+    notes_dir.mkdir()
+    (notes_dir / "Garden.md").write_text("Tomatoes and basil.", encoding="utf-8")
+    (notes_dir / "Recipes.md").write_text("Basil pesto. More basil.", encoding="utf-8")
+    (notes_dir / "Other.md").write_text("Nothing relevant.", encoding="utf-8")
+
+    out = execute_tool("search_vault", {"query": "basil"})
+    assert "Found 2 note(s)" in out
+    assert out.index("Recipes") < out.index("Garden")
+    assert "Other" not in out
+
+
+def test_search_vault_tag_filter(execute_tool, vault_path):
+    """Tag filters match frontmatter and inline tags case-insensitively."""
+    (vault_path / "Tagged.md").write_text("---\ntags: [Work]\n---\nRoadmap draft.", encoding="utf-8")
+    (vault_path / "Inline.md").write_text("Roadmap thoughts #project", encoding="utf-8")
+    (vault_path / "Untagged.md").write_text("Roadmap, no tags.", encoding="utf-8")
+
+    out = execute_tool("search_vault", {"query": "roadmap", "tags": ["work", "PROJECT"]})
+    assert "Found 2 note(s)" in out
+    assert "Untagged" not in out
+
+
+def test_search_vault_sees_note_changes(execute_tool, vault_path):
+    """Cached note parses are refreshed when a note changes on disk."""
+    note = vault_path / "Journal.md"
+    note.write_text("Thinking about sourdough.", encoding="utf-8")
+    assert "Found 1 note(s)" in execute_tool("search_vault", {"query": "sourdough"})
+
+    note.write_text("Thinking about focaccia instead.", encoding="utf-8")
+    assert "No notes found" in execute_tool("search_vault", {"query": "sourdough"})
+    assert "Found 1 note(s)" in execute_tool("search_vault", {"query": "focaccia"})
+
+
+def test_get_preview_snippet():
+    """Snippets collapse whitespace and mark truncation with ellipses."""
+    from obsidian import _get_preview_snippet
+
+    assert _get_preview_snippet("short\n\n  note", 0) == "short note"
+    content = "a" * 100 + " needle\n\tin   text " + "b" * 100
+    snippet = _get_preview_snippet(content, content.index("needle"), context_length=40)
+    assert snippet.startswith("...") and snippet.endswith("...")
+    assert "needle in text" in snippet
+
+
+def test_parse_inline_tags():
+    """Inline #tags are extracted; headings and tag-free notes yield nothing."""
+    from obsidian import _parse_inline_tags
+
+    assert _parse_inline_tags("No tags here.") == []
+    assert _parse_inline_tags("## Heading\n\nPlain text.") == []
+    assert sorted(_parse_inline_tags("#start of note, then #work and #side-project.")) == [
+        "side-project", "start", "work",
+    ]
+
+
+def test_parse_frontmatter_lists():
+    """Tags and topics are read from both inline and block-list frontmatter."""
+    from obsidian import _parse_frontmatter_tags, _parse_frontmatter_metadata
+
+    content = (
+        "---\n"
+        "created: 2026-02-01T10:00:00\n"
+        "tags:\n  - work\n  - side-project\n"
+        "topics:\n- cars\n- money\n"
+        "updated: 2026-02-02T10:00:00\n"
+        "---\n\nBody."
+    )
+    assert _parse_frontmatter_tags(content) == ["work", "side-project"]
+    metadata = _parse_frontmatter_metadata(content)
+    assert metadata["topics"] == ["cars", "money"]
+    assert metadata["created"] == "2026-02-01T10:00:00"
+    assert metadata["updated"] == "2026-02-02T10:00:00"
+
+    assert _parse_frontmatter_tags("---\ntags: [a, 'b']\n---\nBody.") == ["a", "b"]
+
+
+@pytest.mark.parametrize(
+    "frontmatter,key,expected",
+    [
+        ("tags:\n  - a\n  # later\n  \n  - b\n", "tags", ["a", "b"]),
+        ("meta:\n  topics:\n    - a\n    - b\n", "topics", ["a", "b"]),
+        ("tags: [a]\n  - b\n", "tags", ["a", "b"]),
+    ],
+    ids=["comment_and_blank_in_block", "indented_key", "inline_then_block"],
+)
+def test_parse_frontmatter_block_list_edge_cases(frontmatter, key, expected):
+    """Block lists survive indented comments/blank lines, indented keys and mixed inline items."""
+    from obsidian import _parse_frontmatter
+
+    assert _parse_frontmatter(f"---\n{frontmatter}---\nBody.").get(key) == expected
+
+
+@pytest.mark.parametrize(
+    "frontmatter,expected",
+    [
+        ("created:\ncreated: 2026-02-01\n", {"created": ""}),
+        ("created:\nupdated: 2026-02-02\n", {"created": "", "updated": "2026-02-02"}),
+        ("  created: 2026-02-01\n", {"created": "2026-02-01"}),
+    ],
+    ids=["bare_key_wins", "bare_key_before_other", "indented_key"],
+)
+def test_parse_frontmatter_timestamps(frontmatter, expected):
+    """The first created/updated line wins, even when its value is empty."""
+    from obsidian import _parse_frontmatter
+
+    assert _parse_frontmatter(f"---\n{frontmatter}---\nBody.") == expected
+
+
 # --- create_memory_note ---
 
 
@@ -246,6 +386,16 @@ def test_read_memory_note_success(execute_tool, vault_path):
     assert "Secret content" in out
 
 
+def test_read_memory_note_metadata_not_shared(vault_path):
+    """Mutating returned metadata doesn't leak into later reads of the cached note."""
+    from obsidian import create_memory_note, read_memory_note
+
+    create_memory_note("Topical", "Body.", topics=["a"])
+    first = read_memory_note("Topical.md")
+    first["metadata"]["topics"].append("POLLUTED")
+    assert read_memory_note("Topical.md")["metadata"]["topics"] == ["a"]
+
+
 # --- update_memory_note (replace + append) ---
 
 
@@ -299,6 +449,57 @@ def test_list_memory_notes_after_create(execute_tool, vault_path):
     assert "ListedNote" in out or "memory note" in out.lower()
 
 
+def test_list_memory_notes_skips_md_directories(vault_path):
+    """A directory whose name ends in .md is not listed as a note."""
+    from obsidian import create_memory_note, list_memory_notes
+
+    create_memory_note("Real", "X")
+    (vault_path / "AI Memory" / "Folder.md").mkdir()
+    result = list_memory_notes()
+    assert result.get("success")
+    titles = [n["title"] for n in result["notes"]]
+    assert "Real" in titles and "Folder" not in titles
+
+
+def test_list_memory_notes_topics_on_request(execute_tool, vault_path):
+    """Topics are only read from frontmatter when include_topics is set."""
+    execute_tool("create_memory_note", {"title": "Cars", "content": "X", "topics": ["vehicles"]})
+    out = execute_tool("list_memory_notes", {})
+    assert "Cars" in out and "Updated:" in out
+    assert "vehicles" not in out
+
+    out = execute_tool("list_memory_notes", {"include_topics": "false"})
+    assert "vehicles" not in out
+
+    out = execute_tool("list_memory_notes", {"include_topics": True})
+    assert "Topics: vehicles" in out
+
+
+def test_list_memory_notes_updated_to_seconds(vault_path):
+    """'updated' is the file mtime as a local ISO timestamp without microseconds."""
+    from obsidian import create_memory_note, list_memory_notes
+
+    create_memory_note("Stamped", "X")
+    updated = {n["title"]: n["updated"] for n in list_memory_notes()["notes"]}["Stamped"]
+    assert re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}", updated)
+
+
+def test_list_memory_notes_skips_paths_outside_memory(vault_path, tmp_path, monkeypatch):
+    """A path that can't be made relative to AI Memory/ is skipped, not fatal."""
+    from obsidian import create_memory_note, list_memory_notes
+
+    create_memory_note("Kept", "X")
+    outside = tmp_path / "Elsewhere.md"
+    outside.write_text("X", encoding="utf-8")
+    rglob = Path.rglob
+    monkeypatch.setattr(Path, "rglob", lambda self, pattern: [outside, *rglob(self, pattern)])
+
+    result = list_memory_notes()
+    assert result.get("success")
+    titles = [n["title"] for n in result["notes"]]
+    assert "Kept" in titles and "Elsewhere" not in titles
+
+
 # --- delete_memory_note ---
 
 
@@ -344,12 +545,19 @@ def test_write_organized_memory_path_traversal_prevention(vault_path):
     assert (memory_dir / "context/personal.md").exists()
     assert (memory_dir / "timelines/current-goals.md").exists()
 
-    # Check that no files escaped the AI Memory folder
-    parent_of_memory = memory_dir.parent
-    for bad_file in ["passwd", "shadow", "keys", "bad"]:
-        escaped = list(parent_of_memory.rglob(f"*{bad_file}*"))
-        outside = [p for p in escaped if memory_dir not in p.parents and p != memory_dir]
-        assert not outside, f"Path traversal created file outside AI Memory: {outside}"
+    # Check that no files escaped the AI Memory folder: the exact files the
+    # relative payloads would have produced, then one walk of the vault
+    for escape in (
+        memory_dir / "context" / "../../etc/passwd.md",
+        memory_dir / "timelines" / "../../../tmp/bad.md",
+    ):
+        assert not escape.resolve().exists(), f"Path traversal created {escape.resolve()}"
+    outside = [
+        p for p in vault_path.rglob("*")
+        if memory_dir not in p.parents and p != memory_dir
+        and any(bad in p.name for bad in ("passwd", "shadow", "keys", "bad"))
+    ]
+    assert not outside, f"Path traversal created file outside AI Memory: {outside}"
 
 
 # --- unknown tool ---
@@ -363,43 +571,31 @@ def test_unknown_tool(execute_tool, vault_path):
 # --- consolidation agentic loop ---
 
 
+def _llm_reply(content=None, tool_calls=None):
+    """A non-streaming call_llm return value, for scripting agent-loop tests."""
+    return {"choices": [{"message": {"content": content, "tool_calls": tool_calls}}]}
+
+
+def _tool_call(call_id, name, arguments="{}"):
+    return {"id": call_id, "function": {"name": name, "arguments": arguments}}
+
+
 def test_consolidation_is_agentic(vault_path):
     """Consolidation uses an agentic loop: tool results are fed back to the LLM."""
     from llm import run_agent_loop
     from tools import CONSOLIDATION_TOOLS
 
-    call_count = 0
-
-    def mock_call_llm(messages, tools=None, stream=False, live_display=None, max_tokens=500):
-        nonlocal call_count
-        call_count += 1
-        if call_count == 1:
-            return {
-                "choices": [{
-                    "message": {
-                        "content": None,
-                        "tool_calls": [{
-                            "id": "call_0",
-                            "function": {"name": "read_core_memory", "arguments": "{}"},
-                        }],
-                    },
-                }],
-            }
-        return {
-            "choices": [{
-                "message": {
-                    "content": "Memory reviewed.",
-                    "tool_calls": None,
-                },
-            }],
-        }
+    script = [
+        _llm_reply(tool_calls=[_tool_call("call_0", "read_core_memory")]),
+        _llm_reply("Memory reviewed."),
+    ]
 
     initial_messages = [
         {"role": "system", "content": "Consolidate memory."},
         {"role": "user", "content": "Conversation summary: user said they like tests."},
     ]
 
-    with patch("llm.call_llm", side_effect=mock_call_llm):
+    with patch("llm.call_llm", side_effect=script) as mock_call_llm:
         result = run_agent_loop(
             initial_messages=initial_messages,
             tools=CONSOLIDATION_TOOLS,
@@ -409,7 +605,7 @@ def test_consolidation_is_agentic(vault_path):
         )
 
     assert result["iterations"] == 2
-    assert call_count == 2
+    assert mock_call_llm.call_count == 2
 
     tool_messages = [m for m in result["messages"] if m.get("role") == "tool"]
     assert len(tool_messages) == 1
@@ -417,6 +613,82 @@ def test_consolidation_is_agentic(vault_path):
     assert "Core" in tool_messages[0].get("content", "") or "empty" in tool_messages[0].get("content", "").lower()
 
 
+def test_agent_loop_parallel_reads_keep_order(execute_tool, vault_path):
+    """Several read-only calls in one turn run concurrently but report in call order."""
+    from llm import run_agent_loop
+    from tools import CHAT_TOOLS
+
+    execute_tool("write_memory", {"path": "context/work", "content": "Engineer."})
+    execute_tool("write_memory", {"path": "context/hobbies", "content": "Climbing."})
+    script = [
+        _llm_reply(tool_calls=[
+            _tool_call("a", "read_memory", '{"path": "context/work"}'),
+            _tool_call("b", "read_memory", '{"path": "context/hobbies"}'),
+            _tool_call("c", "read_core_memory"),
+        ]),
+        _llm_reply("Done."),
+    ]
+
+    with patch("llm.call_llm", side_effect=script):
+        result = run_agent_loop(
+            initial_messages=[{"role": "user", "content": "What do you know?"}],
+            tools=CHAT_TOOLS,
+            stream_first_response=False,
+            show_tool_calls=False,
+        )
+
+    tool_messages = [m for m in result["messages"] if m.get("role") == "tool"]
+    assert [m["tool_call_id"] for m in tool_messages] == ["a", "b", "c"]
+    assert "Engineer." in tool_messages[0]["content"]
+    assert "Climbing." in tool_messages[1]["content"]
+
+
+# --- request encoding ---
+
+
+def test_request_body_includes_tools():
+    """The encoded body is the payload plus the tools list, serialized once per list."""
+    import llm
+    from tools import CHAT_TOOLS
+
+    payload = {"model": "m", "messages": [{"role": "user", "content": "héllo"}], "stream": False}
+    body = llm._encode_request_body(payload, CHAT_TOOLS)
+    assert json.loads(body) == {**payload, "tools": list(CHAT_TOOLS)}
+    assert llm._tools_json(CHAT_TOOLS) is llm._tools_json(CHAT_TOOLS)
+    assert json.loads(llm._encode_request_body(payload, None)) == payload
+
+
+def test_streaming_display_updates_throttled():
+    """Streaming renders at most once per interval and always ends on the full reply."""
+    import llm
+
+    chunks = [f"word{i} " for i in range(200)]
+    lines = [f"data: {json.dumps({'choices': [{'delta': {'content': c}}]})}".encode() for c in chunks]
+    lines.append(b"data: [DONE]")
+
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+        def iter_lines(self):
+            return iter(lines)
+
+    class FakeDisplay:
+        def __init__(self):
+            self.updates = []
+
+        def update(self, renderable):
+            self.updates.append(renderable.markup)
+
+    display = FakeDisplay()
+    with patch("llm.requests.post", return_value=FakeResponse()), \
+            patch("llm.STREAM_RENDER_INTERVAL", 3600):
+        result = llm.call_llm([{"role": "user", "content": "hi"}], stream=True, live_display=display)
+
+    assert result["choices"][0]["message"]["content"] == "".join(chunks)
+    assert display.updates == [chunks[0], "".join(chunks)]
+
+
 # --- truncate_messages ---
 
 
@@ -431,9 +703,14 @@ def test_truncate_messages():
         {"role": "user", "content": "Message 2"},
         {"role": "assistant", "content": "Response 2"},
     ]
-    for i in range(3, 33):
-        messages.append({"role": "user", "content": f"Message {i}"})
-        messages.append({"role": "assistant", "content": f"Response {i}"})
+    messages.extend(
+        m
+        for i in range(3, 33)
+        for m in (
+            {"role": "user", "content": f"Message {i}"},
+            {"role": "assistant", "content": f"Response {i}"},
+        )
+    )
 
     result = truncate_messages(messages, max_messages=20)
 
@@ -450,6 +727,20 @@ def test_truncate_messages():
     assert not any(m.get("content") == "Response 1" for m in result)
 
 
+@pytest.mark.parametrize("n", [20, 2000, 20000])
+def test_truncate_messages_long_conversations(n):
+    """Truncation keeps the system message and exactly the latest turns at any length."""
+    from llm import truncate_messages
+
+    messages = [{"role": "system", "content": "System prompt"}]
+    messages.extend({"role": "assistant" if i % 2 else "user", "content": f"m{i}"} for i in range(n))
+
+    result = truncate_messages(messages, max_messages=20)
+
+    assert result[0] == messages[0]
+    assert result[1:] == messages[-20:]
+
+
 def test_truncate_messages_no_truncation_needed():
     """When under limit, messages are returned unchanged."""
     from llm import truncate_messages
@@ -567,11 +858,10 @@ def test_read_soul_returns_content(vault_path):
 
 def test_read_soul_fallback_when_missing(vault_path):
     """read_soul returns fallback when soul/ directory is missing."""
-    import shutil
     from memory import read_soul, SOUL_FALLBACK
 
     soul_dir = vault_path / "AI Memory" / "soul"
-    shutil.rmtree(soul_dir)
+    soul_dir.rename(vault_path / "soul-moved")
     content = read_soul()
     assert content == SOUL_FALLBACK
 
@@ -587,6 +877,20 @@ def test_read_soul_fallback_when_empty(vault_path):
     assert content == SOUL_FALLBACK
 
 
+def test_read_soul_cached_until_files_change(execute_tool, vault_path):
+    """read_soul reuses its result until a soul write or an outside edit."""
+    from memory import read_soul
+
+    first = read_soul()
+    assert read_soul() is first
+
+    (vault_path / "AI Memory" / "soul" / "unresolved.md").write_text("# Unresolved\n\nEdited outside.\n", encoding="utf-8")
+    assert "Edited outside." in read_soul()
+
+    execute_tool("update_soul", {"file": "opinions", "content": "Tabs over spaces."})
+    assert "Tabs over spaces." in read_soul()
+
+
 def test_update_soul_tool(execute_tool, vault_path):
     """update_soul tool should write to soul/soul.md by default."""
     out = execute_tool("update_soul", {"content": "# soul.md\n\nI am evolving."})
@@ -601,40 +905,41 @@ def test_update_soul_empty_content_rejected(execute_tool, vault_path):
     assert "Error" in out
 
 
-def test_write_memory_blocks_soul(execute_tool, vault_path):
-    """write_memory should reject attempts to write to soul."""
-    out = execute_tool("write_memory", {"path": "soul", "content": "Hijacked."})
-    assert "Error" in out and "update_soul" in out
-
-
-def test_write_memory_blocks_soul_md(execute_tool, vault_path):
-    """write_memory should reject 'soul.md' path variant."""
-    out = execute_tool("write_memory", {"path": "soul.md", "content": "Hijacked."})
-    assert "Error" in out and "update_soul" in out
-
-
-def test_write_memory_blocks_soul_directory(execute_tool, vault_path):
-    """write_memory should reject paths under soul/."""
-    out = execute_tool("write_memory", {"path": "soul/observations", "content": "Hijacked."})
-    assert "Error" in out and "update_soul" in out
-
-
-def test_create_memory_note_blocks_soul(execute_tool, vault_path):
-    """create_memory_note should reject 'soul' as a title."""
-    out = execute_tool("create_memory_note", {"title": "soul", "content": "Hijacked."})
-    assert "Error" in out and "protected" in out.lower()
-
-
-def test_update_memory_note_blocks_soul(execute_tool, vault_path):
-    """update_memory_note should reject soul paths."""
-    out = execute_tool("update_memory_note", {"filename": "soul/soul.md", "new_content": "Hijacked."})
-    assert "Error" in out and "protected" in out.lower()
-
-
-def test_delete_memory_note_blocks_soul(execute_tool, vault_path):
-    """delete_memory_note should reject soul paths."""
-    out = execute_tool("delete_memory_note", {"filename": "soul/soul.md"})
-    assert "Error" in out and "protected" in out.lower()
+@pytest.mark.parametrize(
+    "tool,args,expected",
+    [
+        ("write_memory", {"path": "soul", "content": "Hijacked."}, "update_soul"),
+        ("write_memory", {"path": "soul.md", "content": "Hijacked."}, "update_soul"),
+        ("write_memory", {"path": "soul/observations", "content": "Hijacked."}, "update_soul"),
+        ("create_memory_note", {"title": "soul", "content": "Hijacked."}, "protected"),
+        ("create_memory_note", {"title": "test", "subfolder": "soul", "content": "X"}, "protected"),
+        ("update_memory_note", {"filename": "soul/soul.md", "new_content": "Hijacked."}, "protected"),
+        ("delete_memory_note", {"filename": "soul/soul.md"}, "protected"),
+    ],
+    ids=[
+        "write_memory-soul",
+        "write_memory-soul_md",
+        "write_memory-soul_directory",
+        "create_memory_note-soul",
+        "create_memory_note-soul_subfolder",
+        "update_memory_note-soul",
+        "delete_memory_note-soul",
+    ],
+)
+def test_memory_tools_block_soul(execute_tool, vault_path, tool, args, expected):
+    """General memory tools must refuse soul paths and point elsewhere."""
+    out = execute_tool(tool, args)
+    assert "Error" in out and expected in out.lower()
+
+
+def test_is_soul_path():
+    """Soul paths are recognised regardless of case, separator, or .md suffix."""
+    from obsidian import _is_soul_path
+
+    for path in ("soul", "Soul.md", " soul ", "soul/", "soul/observations.md", "SOUL\\soul.md", "topics/soul"):
+        assert _is_soul_path(path), path
+    for path in ("soulmate", "topics/soulful.md", "soul.md.md", "my-soul", "notes/soul/x"):
+        assert not _is_soul_path(path), path
 
 
 def test_list_memory_notes_excludes_soul(execute_tool, vault_path):
@@ -660,6 +965,136 @@ def test_soul_in_system_prompt(vault_path):
     assert "I am Memoria" in prompt
 
 
+def test_system_prompt_rebuilt_after_changes(execute_tool, vault_path, monkeypatch):
+    """The cached system prompt picks up memory writes and external soul edits."""
+    from datetime import datetime
+    from prompts import build_system_prompt
+
+    class _FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2026, 2, 14, 9, 30)
+
+    monkeypatch.setattr("prompts.datetime", _FixedDatetime)
+
+    first = build_system_prompt()
+    assert build_system_prompt() is first
+
+    execute_tool("write_memory", {"path": "context/hobbies", "content": "Climbing."})
+    assert "hobbies" in build_system_prompt()
+
+    soul_path = vault_path / "AI Memory" / "soul" / "opinions.md"
+    soul_path.write_text("# Opinions\n\nEdited by hand in Obsidian.\n", encoding="utf-8")
+    assert "Edited by hand in Obsidian." in build_system_prompt()
+
+
+def test_rejected_writes_keep_prompt_cache(execute_tool, vault_path):
+    """Validation failures leave the memory signature, and so the cached prompt, untouched."""
+    from memory import memory_signature
+
+    before = memory_signature()
+    execute_tool("write_memory", {"path": "archive/2026-01", "content": "x"})
+    execute_tool("update_soul", {"content": "x", "file": "observations"})
+    execute_tool("update_observations", {"observation": "  "})
+    execute_tool("archive_memory", {"content": "x", "date": "2026"})
+    assert memory_signature() == before
+
+    execute_tool("write_memory", {"path": "context/hobbies", "content": "Climbing."})
+    assert memory_signature() != before
+
+
+def test_system_prompt_segments(vault_path):
+    """Segments have stable ids, end with the date, and join to the prompt string."""
+    from prompts import SYSTEM_PROMPT, build_system_prompt, build_system_prompt_segments
+
+    segments = build_system_prompt_segments()
+    assert [seg_id for seg_id, _, _ in segments] == ["instructions", "soul", "memory_map", "date"]
+    assert segments[0][1] == SYSTEM_PROMPT
+    assert [reusable for _, _, reusable in segments] == [True, True, True, False]
+    assert "".join(text for _, text, _ in segments) == build_system_prompt()
+
+
+def test_system_prompt_rebuilt_after_note_writes(vault_path, monkeypatch):
+    """Creating or deleting a memory note refreshes the cached prompt within the same minute."""
+    from datetime import datetime
+    from obsidian import create_memory_note, delete_memory_note
+    from prompts import build_system_prompt
+
+    class _FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2026, 2, 14, 9, 30)
+
+    monkeypatch.setattr("prompts.datetime", _FixedDatetime)
+
+    assert "Trip plans" not in build_system_prompt()
+    assert create_memory_note("Trip plans", "Lisbon in May.", subfolder="context").get("success")
+    assert "Trip plans" in build_system_prompt()
+    assert delete_memory_note("context/Trip plans.md").get("success")
+    assert "Trip plans" not in build_system_prompt()
+
+
+def test_cache_breakpoint_on_static_system_prompt(vault_path):
+    """The prefix before the date line is marked cacheable; other messages pass through."""
+    from llm import with_cache_breakpoints
+    from prompts import SYSTEM_PROMPT, build_system_prompt
+
+    system = {"role": "system", "content": build_system_prompt()}
+    user = {"role": "user", "content": "hi"}
+    sent = with_cache_breakpoints([system, user])
+
+    parts = sent[0]["content"]
+    assert parts[0] == {"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+    assert "## Who I Am" in parts[1]["text"] and parts[1]["cache_control"] == {"type": "ephemeral"}
+    assert parts[2]["text"].startswith("\n\nCurrent date and time: ")
+    assert "cache_control" not in parts[2]
+    assert "".join(p["text"] for p in parts) == system["content"]
+    assert sent[1] is user
+    assert isinstance(system["content"], str)
+
+
+def test_cache_breakpoint_on_stale_system_prompt(execute_tool, vault_path):
+    """A system message built before a memory write only caches the segments that still match."""
+    from llm import with_cache_breakpoints
+    from prompts import SYSTEM_PROMPT, build_system_prompt
+
+    stale = build_system_prompt()
+    execute_tool("create_memory_note", {"title": "Trip plans", "content": "Lisbon.", "subfolder": "context"})
+    parts = with_cache_breakpoints([{"role": "system", "content": stale}])[0]["content"]
+
+    # Instructions and soul are unchanged; the memory map now lists the new note
+    assert parts[0] == {"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+    assert parts[1]["text"].startswith("\n\n## Who I Am") and "cache_control" in parts[1]
+    assert parts[2]["text"].startswith("\n\n## Memory map") and "cache_control" not in parts[2]
+    assert "".join(p["text"] for p in parts) == stale
+
+
+def test_no_cache_breakpoint_below_minimum(vault_path, monkeypatch):
+    """Prefixes shorter than the provider's cache minimum are sent as plain strings."""
+    import llm
+    from prompts import SYSTEM_PROMPT_TOKENS, build_system_prompt
+
+    monkeypatch.setattr(llm, "PROMPT_CACHE_MIN_TOKENS", SYSTEM_PROMPT_TOKENS + 1)
+    messages = [{"role": "system", "content": build_system_prompt()}]
+    assert llm.with_cache_breakpoints(messages) is messages
+
+
+def test_no_cache_breakpoint_for_consolidation(vault_path, monkeypatch):
+    """Non-chat system prompts pass through without building prompt segments."""
+    import prompts
+    from llm import with_cache_breakpoints
+
+    def _fail():
+        raise AssertionError("segments built for a non-chat prompt")
+
+    monkeypatch.setattr(prompts, "build_system_prompt_segments", _fail)
+    messages = [
+        {"role": "system", "content": prompts.CONSOLIDATION_SYSTEM_PROMPT},
+        {"role": "user", "content": "Conversation:\nuser: hi"},
+    ]
+    assert with_cache_breakpoints(messages) is messages
+
+
 def test_soul_in_consolidation_context(vault_path):
     """build_consolidation_user_message should include soul content."""
     from prompts import build_consolidation_user_message
@@ -669,20 +1104,42 @@ def test_soul_in_consolidation_context(vault_path):
     assert "I am Memoria" in msg
 
 
+def test_consolidation_message_compresses_conversation(vault_path):
+    """Tool traffic is summarized, long messages truncated, empty ones dropped."""
+    from prompts import build_consolidation_user_message
+
+    messages = [
+        {"role": "system", "content": "ignored"},
+        {"role": "user", "content": "  " + "a" * 400 + "  "},
+        {"role": "assistant", "content": "", "tool_calls": [{"function": {"name": "read_memory"}}]},
+        {"role": "tool", "name": "read_memory", "content": "long tool output"},
+        {"role": "assistant", "content": "   "},
+        {"role": "assistant", "content": "Done."},
+    ]
+    msg = build_consolidation_user_message(messages, "")
+    snippet = msg.split("Conversation context (recent messages):\n---\n", 1)[1]
+    assert snippet.splitlines()[:4] == [
+        "user: " + "a" * 300 + "...",
+        "assistant: [called read_memory]",
+        "tool: [read_memory result]",
+        "assistant: Done.",
+    ]
+    assert "ignored" not in msg
+    assert "(no messages)" in build_consolidation_user_message([], "")
+
+
 def test_update_soul_in_consolidation_tools():
     """update_soul should be in CONSOLIDATION_TOOLS (for soul reflection during consolidation)."""
     from tools import CONSOLIDATION_TOOLS
 
-    tool_names = [t["function"]["name"] for t in CONSOLIDATION_TOOLS]
-    assert "update_soul" in tool_names
+    assert "update_soul" in _tool_names(CONSOLIDATION_TOOLS)
 
 
 def test_update_soul_in_chat_tools():
     """update_soul should be in CHAT_TOOLS."""
     from tools import CHAT_TOOLS
 
-    tool_names = [t["function"]["name"] for t in CHAT_TOOLS]
-    assert "update_soul" in tool_names
+    assert "update_soul" in _tool_names(CHAT_TOOLS)
 
 
 # --- soul directory: new tests ---
@@ -701,12 +1158,6 @@ def test_update_soul_invalid_file(execute_tool, vault_path):
     assert "Error" in out
 
 
-def test_create_memory_note_blocks_soul_subfolder(execute_tool, vault_path):
-    """create_memory_note should reject notes in soul/ subfolder."""
-    out = execute_tool("create_memory_note", {"title": "test", "subfolder": "soul", "content": "X"})
-    assert "Error" in out and "protected" in out.lower()
-
-
 def test_delete_ai_memory_preserves_soul(vault_path):
     """delete_ai_memory_folder should preserve the soul/ directory."""
     # Create some user memory
@@ -770,28 +1221,25 @@ def test_legacy_soul_migration(tmp_path, monkeypatch):
 # --- observations: append-only log ---
 
 
-def test_update_observations_first_entry(execute_tool, vault_path):
+def test_update_observations_first_entry(execute_tool, obs_path):
     """First observation replaces default content and creates a timestamped entry."""
     out = execute_tool("update_observations", {"observation": "User seems curious about systems."})
     assert "logged" in out.lower()
     assert "1 entries" in out
 
-    obs_path = vault_path / "AI Memory" / "soul" / "observations.md"
     content = obs_path.read_text(encoding="utf-8")
     assert "# Observations" in content
     assert "User seems curious about systems." in content
     assert "---" in content
     # Should have a timestamp
-    import re
-    assert re.search(r'\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}\]', content)
+    assert _OBS_TIMESTAMP_RE.search(content)
 
 
-def test_update_observations_appends(execute_tool, vault_path):
+def test_update_observations_appends(execute_tool, obs_path):
     """Subsequent observations append without overwriting."""
     execute_tool("update_observations", {"observation": "First pattern noticed."})
     execute_tool("update_observations", {"observation": "Second pattern noticed."})
 
-    obs_path = vault_path / "AI Memory" / "soul" / "observations.md"
     content = obs_path.read_text(encoding="utf-8")
     assert "First pattern noticed." in content
     assert "Second pattern noticed." in content
@@ -802,35 +1250,26 @@ def test_update_observations_appends(execute_tool, vault_path):
     assert "Third." in content
 
 
-def test_update_observations_rejects_full_rewrite(execute_tool, vault_path):
-    """Passing a full file rewrite (starting with #) is rejected."""
-    out = execute_tool("update_observations", {
-        "observation": "# Observations\n\nRewritten content."
-    })
-    assert "Error" in out
-    assert "rewrite" in out.lower()
-
-
-def test_update_observations_rejects_multiple_entries(execute_tool, vault_path):
-    """Passing multiple entries in one call is rejected."""
-    out = execute_tool("update_observations", {
-        "observation": "First.\n---\n[2026-01-01 12:00]\nSecond."
-    })
-    assert "Error" in out
-    assert "single" in out.lower()
-
-
-def test_update_observations_empty_rejected(execute_tool, vault_path):
-    """Empty observation is rejected."""
-    out = execute_tool("update_observations", {"observation": ""})
+@pytest.mark.parametrize(
+    "observation,needle",
+    [
+        ("# Observations\n\nRewritten content.", "rewrite"),
+        ("First.\n---\n[2026-01-01 12:00]\nSecond.", "single"),
+        ("", "required"),
+    ],
+    ids=["full_rewrite", "multiple_entries", "empty"],
+)
+def test_update_observations_rejects_invalid(execute_tool, vault_path, observation, needle):
+    """Full rewrites, multiple entries and empty text are rejected; observations are append-only."""
+    out = execute_tool("update_observations", {"observation": observation})
     assert "Error" in out
+    assert needle in out.lower()
 
 
-def test_update_observations_legacy_migration(vault_path):
+def test_update_observations_legacy_migration(obs_path):
     """Legacy free-form observations content gets wrapped as a summary block."""
     from memory import update_observations
 
-    obs_path = vault_path / "AI Memory" / "soul" / "observations.md"
     obs_path.write_text(
         "# Observations\n\nUser is curious and asks good questions.\nThey work late often.\n",
         encoding="utf-8",
@@ -848,7 +1287,7 @@ def test_update_observations_legacy_migration(vault_path):
 # --- resolve_observation ---
 
 
-def test_resolve_observation_by_text(execute_tool, vault_path):
+def test_resolve_observation_by_text(execute_tool, obs_path):
     """Resolve an observation by matching partial text."""
     execute_tool("update_observations", {"observation": "They seem stressed about deadlines."})
     out = execute_tool("resolve_observation", {
@@ -857,19 +1296,16 @@ def test_resolve_observation_by_text(execute_tool, vault_path):
     })
     assert "resolved" in out.lower()
 
-    obs_path = vault_path / "AI Memory" / "soul" / "observations.md"
     content = obs_path.read_text(encoding="utf-8")
     assert "[resolved: They confirmed deadlines are manageable now]" in content
 
 
-def test_resolve_observation_by_timestamp(execute_tool, vault_path):
+def test_resolve_observation_by_timestamp(execute_tool, obs_path):
     """Resolve an observation by matching timestamp."""
     execute_tool("update_observations", {"observation": "Pattern A."})
 
-    obs_path = vault_path / "AI Memory" / "soul" / "observations.md"
     content = obs_path.read_text(encoding="utf-8")
-    import re
-    ts_match = re.search(r'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2})\]', content)
+    ts_match = _OBS_TIMESTAMP_RE.search(content)
     assert ts_match
     timestamp = ts_match.group(1)
 
@@ -880,15 +1316,21 @@ def test_resolve_observation_by_timestamp(execute_tool, vault_path):
     assert "resolved" in out.lower()
 
 
-def test_resolve_observation_not_found(execute_tool, vault_path):
-    """Resolving a non-existent observation returns an error."""
+@pytest.mark.parametrize(
+    "identifier,reason,needle",
+    [
+        ("nonexistent text", "test", "No unresolved"),
+        ("", "test", "identifier is required"),
+        ("test", "", "reason is required"),
+    ],
+    ids=["not_found", "missing_identifier", "missing_reason"],
+)
+def test_resolve_observation_errors(execute_tool, vault_path, identifier, reason, needle):
+    """Unknown observations and missing identifier/reason return errors."""
     execute_tool("update_observations", {"observation": "Some observation."})
-    out = execute_tool("resolve_observation", {
-        "identifier": "nonexistent text",
-        "reason": "test",
-    })
+    out = execute_tool("resolve_observation", {"identifier": identifier, "reason": reason})
     assert "Error" in out
-    assert "No unresolved" in out
+    assert needle in out
 
 
 def test_resolve_observation_already_resolved(execute_tool, vault_path):
@@ -905,14 +1347,6 @@ def test_resolve_observation_already_resolved(execute_tool, vault_path):
     assert "Error" in out
 
 
-def test_resolve_observation_missing_args(execute_tool, vault_path):
-    """Missing identifier or reason returns error."""
-    out = execute_tool("resolve_observation", {"identifier": "", "reason": "test"})
-    assert "Error" in out
-    out = execute_tool("resolve_observation", {"identifier": "test", "reason": ""})
-    assert "Error" in out
-
-
 # --- read_observations_for_context ---
 
 
@@ -929,11 +1363,10 @@ def test_read_observations_for_context_filters_resolved(vault_path):
     assert "Resolved observation." not in context
 
 
-def test_read_observations_for_context_includes_summary(vault_path):
+def test_read_observations_for_context_includes_summary(obs_path):
     """Summary block is included in context loading."""
     from memory import read_observations_for_context
 
-    obs_path = vault_path / "AI Memory" / "soul" / "observations.md"
     obs_path.write_text(
         "# Observations\n\n"
         "## Summarized observations (through 2026-02-01)\n"
@@ -967,42 +1400,55 @@ def test_observations_consolidation_not_needed(vault_path):
     assert not check_observations_need_consolidation()
 
 
-def test_observations_consolidation_needed_by_count(vault_path):
+def test_observations_consolidation_needed_by_count(vault_path, monkeypatch):
     """Over entry count threshold triggers consolidation."""
-    from memory import update_observations, check_observations_need_consolidation, OBSERVATIONS_MAX_ENTRIES
+    from memory import update_observations, check_observations_need_consolidation
 
-    for i in range(OBSERVATIONS_MAX_ENTRIES + 1):
+    # Thresholds are read at call time; a small one keeps the log short
+    max_entries = 3
+    monkeypatch.setattr("memory.OBSERVATIONS_MAX_ENTRIES", max_entries)
+    for i in range(max_entries):
         update_observations(f"Observation {i}.")
+    assert not check_observations_need_consolidation()
 
+    # One entry past the limit
+    update_observations(f"Observation {max_entries}.")
     assert check_observations_need_consolidation()
 
 
-def test_observations_consolidation_needed_by_tokens(vault_path):
+def test_observations_consolidation_needed_by_tokens(vault_path, monkeypatch):
     """Over token threshold triggers consolidation."""
     from memory import update_observations, check_observations_need_consolidation
 
-    # Write entries that exceed 800 tokens (~3200 chars)
-    for i in range(10):
-        update_observations("x" * 350 + f" observation {i}")
+    # ~100 tokens per entry: the first stays under 150, the second crosses it
+    monkeypatch.setattr("memory.OBSERVATIONS_TOKEN_THRESHOLD", 150)
+    update_observations("x" * 350 + " observation 0")
+    assert not check_observations_need_consolidation()
 
+    update_observations("x" * 350 + " observation 1")
     assert check_observations_need_consolidation()
 
 
 # --- prepare_observations_for_consolidation ---
 
 
-def test_prepare_observations_splits_correctly(vault_path):
+def test_prepare_observations_splits_correctly(vault_path, monkeypatch):
     """Preparation splits old vs recent entries correctly."""
-    from memory import update_observations, prepare_observations_for_consolidation, OBSERVATIONS_KEEP_RECENT
+    from memory import update_observations, prepare_observations_for_consolidation
 
-    for i in range(OBSERVATIONS_KEEP_RECENT + 5):
+    # Write older entries to summarize on top of the ones kept verbatim
+    keep_recent = 2
+    old_count = 5
+    monkeypatch.setattr("memory.OBSERVATIONS_KEEP_RECENT", keep_recent)
+    for i in range(old_count + keep_recent):
         update_observations(f"Observation {i}.")
 
     prep = prepare_observations_for_consolidation()
     assert prep is not None
-    assert len(prep['recent_entries']) == OBSERVATIONS_KEEP_RECENT
+    assert len(prep['recent_entries']) == keep_recent
     assert "Observation 0." in prep['old_entries_text']
-    assert "Observation 4." in prep['old_entries_text']
+    assert f"Observation {old_count - 1}." in prep['old_entries_text']
+    assert f"Observation {old_count}." not in prep['old_entries_text']
     assert prep['full_content']  # Full content for archiving
 
 
@@ -1017,15 +1463,19 @@ def test_prepare_observations_returns_none_below_threshold(vault_path):
 # --- write_consolidated_observations ---
 
 
-def test_write_consolidated_observations(vault_path):
+def test_write_consolidated_observations(vault_path, obs_path, monkeypatch):
     """Consolidated write archives old content and rewrites the file."""
     from memory import (
         update_observations, prepare_observations_for_consolidation,
-        write_consolidated_observations, OBSERVATIONS_KEEP_RECENT,
+        write_consolidated_observations,
         OBSERVATIONS_ARCHIVE_FILE, _parse_observation_entries,
     )
 
-    for i in range(OBSERVATIONS_KEEP_RECENT + 5):
+    # Older entries to archive on top of the ones kept verbatim
+    keep_recent = 2
+    old_count = 5
+    monkeypatch.setattr("memory.OBSERVATIONS_KEEP_RECENT", keep_recent)
+    for i in range(old_count + keep_recent):
         update_observations(f"Observation {i}.")
 
     prep = prepare_observations_for_consolidation()
@@ -1039,13 +1489,12 @@ def test_write_consolidated_observations(vault_path):
     assert result.get("success")
 
     # Check observations.md has summary + recent entries
-    obs_path = vault_path / "AI Memory" / "soul" / "observations.md"
     content = obs_path.read_text(encoding="utf-8")
     assert "## Summarized observations (through" in content
     assert "User is curious and detail-oriented." in content
 
     parsed = _parse_observation_entries(content)
-    assert len(parsed['entries']) == OBSERVATIONS_KEEP_RECENT
+    assert len(parsed['entries']) == keep_recent
 
     # Check archive was created
     archive_path = vault_path / "AI Memory" / "soul" / OBSERVATIONS_ARCHIVE_FILE
@@ -1069,7 +1518,7 @@ def test_update_soul_blocks_observations(execute_tool, vault_path):
 # --- _parse_observation_entries ---
 
 
-def test_parse_observation_entries_empty(vault_path):
+def test_parse_observation_entries_empty():
     """Parsing empty content returns empty structure."""
     from memory import _parse_observation_entries
 
@@ -1079,7 +1528,7 @@ def test_parse_observation_entries_empty(vault_path):
     assert result['entries'] == []
 
 
-def test_parse_observation_entries_structured(vault_path):
+def test_parse_observation_entries_structured():
     """Parsing structured observations correctly extracts entries."""
     from memory import _parse_observation_entries
 
@@ -1110,16 +1559,14 @@ def test_update_observations_in_chat_tools():
     """update_observations should be in CHAT_TOOLS."""
     from tools import CHAT_TOOLS
 
-    tool_names = [t["function"]["name"] for t in CHAT_TOOLS]
-    assert "update_observations" in tool_names
+    assert "update_observations" in _tool_names(CHAT_TOOLS)
 
 
 def test_resolve_observation_in_chat_tools():
     """resolve_observation should be in CHAT_TOOLS."""
     from tools import CHAT_TOOLS
 
-    tool_names = [t["function"]["name"] for t in CHAT_TOOLS]
-    assert "resolve_observation" in tool_names
+    assert "resolve_observation" in _tool_names(CHAT_TOOLS)
 
 
 def test_observations_not_in_update_soul_enum():
@@ -1151,7 +1598,7 @@ def test_soul_prompt_mentions_update_observations(vault_path):
     assert "update_observations" in prompt
 
 
-def test_consolidation_prompt_mentions_observations(vault_path):
+def test_consolidation_prompt_mentions_observations():
     """Consolidation prompt should mention automatic observation consolidation."""
     from prompts import CONSOLIDATION_SYSTEM_PROMPT
 